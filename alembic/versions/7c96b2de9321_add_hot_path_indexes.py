@@ -0,0 +1,70 @@
+"""Add hot path indexes
+
+Revision ID: 7c96b2de9321
+Revises: f132555a93c0
+Create Date: 2026-10-18 10:12:41.220517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c96b2de9321'
+down_revision: Union[str, Sequence[str], None] = 'f132555a93c0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_INDEXES = [
+    ('ix_salary_slip_employee_id_month', 'salary_slip'),
+    ('ix_employee_manager_id', 'employee'),
+    ('ix_employee_user_id', 'employee'),
+    ('ix_user_role_id', 'user'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction, so each index is
+    # built in an autocommit block and does not block writes to the table. A failed
+    # concurrent build leaves an INVALID index behind under the same name, so any
+    # leftover is dropped first rather than skipped with IF NOT EXISTS.
+    with op.get_context().autocommit_block():
+        for name, table in _INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+        # Latest slip per employee: DISTINCT ON / ORDER BY employee_id, month DESC, id DESC,
+        # covering the report and PDF columns so they are served by index-only scans.
+        op.create_index(
+            'ix_salary_slip_employee_id_month',
+            'salary_slip',
+            ['employee_id', sa.text('month DESC'), sa.text('id DESC')],
+            postgresql_include=['base_salary', 'working_days', 'vacation_days', 'bonuses', 'total_salary'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_employee_manager_id',
+            'employee',
+            ['manager_id', 'id'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_employee_user_id',
+            'employee',
+            ['user_id'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_user_role_id',
+            'user',
+            ['role_id'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table in reversed(_INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,42 @@
+"""Add archive_entry manifest
+
+Revision ID: b41e7d09a2c6
+Revises: 7c96b2de9321
+Create Date: 2026-10-18 11:03:27.518904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b41e7d09a2c6'
+down_revision: Union[str, Sequence[str], None] = '7c96b2de9321'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('archive_entry',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=50), nullable=False),
+    sa.Column('path', sa.String(length=500), nullable=False),
+    sa.Column('manager_id', sa.Integer(), nullable=True),
+    sa.Column('employee_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['employee_id'], ['employee.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['manager_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_archive_entry_kind_employee_created', 'archive_entry', ['kind', 'employee_id', sa.text('created_at DESC')])
+    op.create_index('ix_archive_entry_kind_manager_created', 'archive_entry', ['kind', 'manager_id', sa.text('created_at DESC')])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_archive_entry_kind_manager_created', table_name='archive_entry')
+    op.drop_index('ix_archive_entry_kind_employee_created', table_name='archive_entry')
+    op.drop_table('archive_entry')
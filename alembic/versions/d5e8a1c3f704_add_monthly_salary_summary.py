@@ -0,0 +1,61 @@
+"""Add monthly_salary_summary
+
+Revision ID: d5e8a1c3f704
+Revises: b41e7d09a2c6
+Create Date: 2026-10-18 19:12:08.402177
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5e8a1c3f704'
+down_revision: Union[str, Sequence[str], None] = 'b41e7d09a2c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('monthly_salary_summary',
+    sa.Column('employee_id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('manager_id', sa.Integer(), nullable=True),
+    sa.Column('department', sa.String(length=100), nullable=True),
+    sa.Column('salary_slip_id', sa.Integer(), nullable=False),
+    sa.Column('base_salary', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('working_days', sa.Integer(), nullable=False),
+    sa.Column('vacation_days', sa.Integer(), nullable=False),
+    sa.Column('bonuses', sa.Numeric(precision=12, scale=2), nullable=True),
+    sa.Column('total_salary', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['employee_id'], ['employee.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['manager_id'], ['user.id'], ),
+    sa.ForeignKeyConstraint(['salary_slip_id'], ['salary_slip.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('employee_id', 'month')
+    )
+    op.create_index('ix_monthly_salary_summary_manager_month', 'monthly_salary_summary', ['manager_id', 'month', 'employee_id'])
+    op.create_index('ix_monthly_salary_summary_department_month', 'monthly_salary_summary', ['department', 'month'])
+    # Backfill every existing month from salary_slip: the latest slip per employee and month.
+    op.execute("""
+        INSERT INTO monthly_salary_summary (
+            employee_id, month, manager_id, department, salary_slip_id,
+            base_salary, working_days, vacation_days, bonuses, total_salary, updated_at
+        )
+        SELECT DISTINCT ON (s.employee_id, date_trunc('month', s.month))
+            s.employee_id, CAST(date_trunc('month', s.month) AS DATE), e.manager_id, e.department, s.id,
+            s.base_salary, s.working_days, s.vacation_days, s.bonuses, s.total_salary, now()
+        FROM salary_slip s
+        JOIN employee e ON e.id = s.employee_id
+        ORDER BY s.employee_id, date_trunc('month', s.month), s.month DESC, s.id DESC
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_monthly_salary_summary_department_month', table_name='monthly_salary_summary')
+    op.drop_index('ix_monthly_salary_summary_manager_month', table_name='monthly_salary_summary')
+    op.drop_table('monthly_salary_summary')
@@ -1,16 +1,31 @@
-from fastapi import APIRouter,  HTTPException, Depends
-from core.auth import manager_required, get_db
-from services.employee_create import create_employee_service
-from services.employee_query import get_all_employees_service, get_all_managers_service
+import csv
+from fastapi import APIRouter,  HTTPException, Depends, Query, Body, Response, UploadFile, File
+from core.auth import manager_required, manager_required_async, get_db, get_async_db
+from services.employee_create import create_employee_service, create_employees_bulk_service, parse_employees_csv
+from services.employee_query import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    get_all_employees_service,
+    get_all_managers_service,
+    get_all_users_service,
+)
 from api.schemas import EmployeeCreate
 from fastapi.encoders import jsonable_encoder
-from models.models import User
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 
 
 router = APIRouter()
 
 
+def _page(response: Response, page: dict) -> list:
+    # The body stays a plain list, as before pagination; the cursor for the next page,
+    # if any, goes in a header.
+    if page["next_cursor"] is not None:
+        response.headers["X-Next-Cursor"] = str(page["next_cursor"])
+    return jsonable_encoder(page["items"])
+
+
 @router.get("/")
 async def read_root(current_user=Depends(manager_required)):
     return {"Hello": "World"}
@@ -28,27 +43,51 @@ def create_employee(emp: EmployeeCreate, db=Depends(get_db), current_user=Depend
         raise HTTPException(status_code=500, detail="Internal server error.")
 
 
+@router.post("/createEmployees")
+def create_employees(employees: list[dict] = Body(...), db=Depends(get_db), current_user=Depends(manager_required)):
+    return create_employees_bulk_service(db, employees)
+
+
+@router.post("/uploadEmployees")
+def upload_employees(file: UploadFile = File(...), db=Depends(get_db), current_user=Depends(manager_required)):
+    try:
+        rows = parse_employees_csv(file.file.read())
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid CSV file: {e}")
+    return create_employees_bulk_service(db, rows)
+
+
 @router.get("/managers")
-def get_managers(db=Depends(get_db), current_user=Depends(manager_required)):
-    managers = get_all_managers_service(db)
-    return jsonable_encoder(managers)
+async def get_managers(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = None,
+    fields: Optional[str] = None,
+    db=Depends(get_async_db),
+    current_user=Depends(manager_required_async)
+):
+    managers = await get_all_managers_service(db, limit=limit, after=after, fields=fields)
+    return _page(response, managers)
 
 
 @router.get("/employees")
-def get_employees(db=Depends(get_db), current_user=Depends(manager_required)):
-    employees = get_all_employees_service(db)
-    return jsonable_encoder(employees)
+async def get_employees(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = None,
+    fields: Optional[str] = None,
+    db=Depends(get_async_db),
+    current_user=Depends(manager_required_async)
+):
+    employees = await get_all_employees_service(db, limit=limit, after=after, fields=fields)
+    return _page(response, employees)
 
 
 @router.get("/users", response_model=list[dict])
-def list_all_users(db: Session = Depends(get_db)):
-    users = db.query(User).all()
-    return [
-        {
-            "id": user.id,
-            "username": user.username,
-            "email": user.email,
-            "role": user.role.name if user.role else None
-        }
-        for user in users
-    ]
\ No newline at end of file
+async def list_all_users(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    return _page(response, await get_all_users_service(db, limit=limit, after=after))
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends
+from core.auth import manager_required, principal_cache_stats
+from core.logging import log_stats
+from db.session import async_engine, pool_stats
+
+
+router = APIRouter()
+
+
+@router.get("/internal/authCacheStats")
+def auth_cache_stats(current_user=Depends(manager_required)):
+    return principal_cache_stats()
+
+
+@router.get("/internal/poolStats")
+def db_pool_stats(current_user=Depends(manager_required)):
+    return {**pool_stats(), "async": pool_stats(async_engine)}
+
+
+@router.get("/internal/logStats")
+def request_log_stats(current_user=Depends(manager_required)):
+    return log_stats()
@@ -1,20 +1,60 @@
-from fastapi import APIRouter, HTTPException, Response, Depends
-from services.pdf_generator import generate_salary_pdf
+from datetime import date
+from fastapi import APIRouter, HTTPException, Request, Response, Depends
+from fastapi.responses import StreamingResponse
+from models.models import Employee
+from services.pdf_generator import load_salary_pdf_data, load_salary_pdf_data_for_employees
+from services.pdf_cache import get_or_render_pdf, pdf_cache_key
+from services.pdf_zip import stream_salary_slips_zip
 from core.auth import manager_required, get_db
+from core.metrics import PDFS_RENDERED
 
 
 router = APIRouter()
 
 
+def _etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
 @router.get("/generateSalaryPdf/{employee_id}")
-def generate_salary_pdf_endpoint(employee_id: int, db=Depends(get_db), current_user=Depends(manager_required)):
+def generate_salary_pdf_endpoint(employee_id: int, request: Request, db=Depends(get_db), current_user=Depends(manager_required)):
     try:
-        pdf_bytes = generate_salary_pdf(db, employee_id)
+        data = load_salary_pdf_data(db, employee_id)
+        today = date.today()
+        key = pdf_cache_key(data, today)
+        etag = f'"{key}"'
+        cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if _etag_matches(request, etag):
+            return Response(status_code=304, headers=cache_headers)
+        pdf_bytes, _, cached = get_or_render_pdf(data, today, key=key)
+        PDFS_RENDERED.inc("cached" if cached else "ok")
         headers = {
-            'Content-Disposition': f'attachment; filename="salary_slip_{employee_id}.pdf"'
+            'Content-Disposition': f'attachment; filename="salary_slip_{employee_id}.pdf"',
+            **cache_headers,
         }
         return Response(content=pdf_bytes, media_type='application/pdf', headers=headers)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception:
         raise HTTPException(status_code=500, detail="Internal server error.")
+
+
+@router.get("/downloadPdfsForEmployees")
+def download_pdfs_for_employees(db=Depends(get_db), current_user=Depends(manager_required)):
+    # Everything is loaded from the DB up front; the response body then only renders.
+    employees = db.query(Employee).filter(Employee.manager_id == current_user.id).order_by(Employee.id).all()
+    if not employees:
+        raise HTTPException(status_code=404, detail="No employees found for this manager.")
+    pdf_data = load_salary_pdf_data_for_employees(db, employees)
+    errors = [f"{emp.email}: Salary slip not found for this month" for emp in employees if emp.id not in pdf_data]
+    today = date.today()
+    headers = {"Content-Disposition": f'attachment; filename="salary_slips_{current_user.id}_{today:%Y-%m}.zip"'}
+    return StreamingResponse(
+        stream_salary_slips_zip(list(pdf_data.values()), errors=errors, today=today),
+        media_type="application/zip",
+        headers=headers,
+    )
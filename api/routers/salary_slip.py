@@ -1,8 +1,17 @@
-from sqlalchemy.orm import Session
-from fastapi import APIRouter, HTTPException, Depends
-from services.salary_slip_create import create_salary_slip_service, get_salary_slips_for_employee
+import csv
+from datetime import date
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, HTTPException, Depends, Body, UploadFile, File, Query
+from services.salary_slip_create import (
+    create_salary_slip_service,
+    create_salary_slips_bulk_service,
+    get_salary_slips_for_employee,
+    parse_salary_slips_csv,
+)
+from services.payroll import DEFAULT_RULES, run_payroll
 from api.salary_schemas import SalarySlipCreate
-from core.auth import manager_required, get_db  
+from core.auth import manager_required, manager_required_async, get_db, get_async_db
 
 
 router = APIRouter()
@@ -18,11 +27,45 @@ def create_salary_slip(slip: SalarySlipCreate, db=Depends(get_db), current_user=
         raise HTTPException(status_code=500, detail="Internal server error.")
 
 
+@router.post("/createSalarySlips")
+def create_salary_slips(slips: list[dict] = Body(...), db=Depends(get_db), current_user=Depends(manager_required)):
+    return create_salary_slips_bulk_service(db, slips)
+
+
+@router.post("/uploadSalarySlips")
+def upload_salary_slips(file: UploadFile = File(...), db=Depends(get_db), current_user=Depends(manager_required)):
+    try:
+        rows = parse_salary_slips_csv(file.file.read())
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid CSV file: {e}")
+    return create_salary_slips_bulk_service(db, rows)
+
+
+@router.post("/computePayroll")
+def compute_payroll(
+    month: date,
+    dry_run: bool = True,
+    preview_limit: int = Query(100, ge=0, le=10000),
+    standard_working_days: Optional[float] = Query(None, gt=0),
+    vacation_pay_rate: Optional[float] = Query(None, ge=0),
+    bonus_rate: Optional[float] = Query(None, ge=0),
+    db=Depends(get_db),
+    current_user=Depends(manager_required)
+):
+    overrides = {
+        "standard_working_days": standard_working_days,
+        "vacation_pay_rate": vacation_pay_rate,
+        "bonus_rate": bonus_rate,
+    }
+    rules = DEFAULT_RULES._replace(**{name: value for name, value in overrides.items() if value is not None})
+    return run_payroll(db, month, dry_run=dry_run, preview_limit=preview_limit, rules=rules)
+
+
 @router.get("/salarySlips/{employee_id}")
-def list_salary_slips(employee_id: int, db: Session = Depends(get_db), current_user=Depends(manager_required)):
+async def list_salary_slips(employee_id: int, db: AsyncSession = Depends(get_async_db), current_user=Depends(manager_required_async)):
     try:
-        return get_salary_slips_for_employee(db, employee_id)
+        return await get_salary_slips_for_employee(db, employee_id)
     except Exception as e:
         print(f"Error listing salary slips for employee {employee_id}: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Internal server error while listing salary slips.")
\ No newline at end of file
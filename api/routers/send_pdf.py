@@ -1,93 +1,109 @@
-import traceback
-from fastapi import APIRouter, Depends
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
-from core.auth import manager_required, get_db
-from core.idempotency import idempotency_key_dependency
-from services.reports_service import create_manager_report, create_pdfs_for_employees, send_report_to_manager, send_pdfs_to_employees
-import redis
-import json
-
-
-redis_client = redis.Redis(host='redis', port=6379, db=0)
+import os
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from core.auth import get_db, manager_required
+from core.idempotency import idempotency_key_dependency, run_idempotent
+from core.jobs import enqueue_job, get_job
+from core.storage import get_storage, iter_artifact
+from services.archive_manifest import SALARY_REPORT, latest_artifact
+
+
 router = APIRouter()
 
 
 @router.post("/createAggregatedEmployeeData")
 def create_report_for_managers(
-    db: Session = Depends(get_db),
     current_user=Depends(manager_required),
     idempotency_key=Depends(idempotency_key_dependency)
 ):
-    redis_key = f"idempotency:createAggregatedEmployeeData:{current_user.id}:{idempotency_key}"
-    cached_result = redis_client.get(redis_key)
-    if cached_result:
-        return JSONResponse(status_code=200, content=json.loads(cached_result))
-    try:
-        result = create_manager_report(db, current_user.id)
-        redis_client.set(redis_key, json.dumps(result), ex=3600)
-        return JSONResponse(status_code=200, content=result)
-    except Exception as e:
-        print(f"Error generating Excel report: {e}")
-        traceback.print_exc()
-        return JSONResponse(status_code=200, content={"sent": 0, "errors": [str(e)]})
+    result = run_idempotent(
+        f"createAggregatedEmployeeData:{current_user.id}",
+        idempotency_key,
+        lambda: enqueue_job("createAggregatedEmployeeData", current_user.id, manager_id=current_user.id),
+    )
+    return JSONResponse(status_code=202, content=result)
 
 
 @router.post("/createPdfForEmployees")
 def create_pdf_for_employees(
-    db: Session = Depends(get_db),
     current_user=Depends(manager_required),
     idempotency_key=Depends(idempotency_key_dependency)
 ):
-    redis_key = f"idempotency:createPdfForEmployees:{current_user.id}:{idempotency_key}"
-    cached_result = redis_client.get(redis_key)
-    if cached_result:
-        return JSONResponse(status_code=200, content=json.loads(cached_result))
-    try:
-        result = create_pdfs_for_employees(db, current_user.id)
-        redis_client.set(redis_key, json.dumps(result), ex=3600)
-        return JSONResponse(status_code=200, content=result)
-    except Exception as e:
-        print(f"Error generating PDF reports: {e}")
-        traceback.print_exc()
-        return JSONResponse(status_code=200, content={"generated": False, "error": str(e), "manager_id": current_user.id})
+    result = run_idempotent(
+        f"createPdfForEmployees:{current_user.id}",
+        idempotency_key,
+        lambda: enqueue_job("createPdfForEmployees", current_user.id, manager_id=current_user.id),
+    )
+    return JSONResponse(status_code=202, content=result)
+
+
+@router.get("/downloadAggregatedEmployeeData")
+def download_report_for_manager(db=Depends(get_db), current_user=Depends(manager_required)):
+    key = latest_artifact(db, SALARY_REPORT, manager_id=current_user.id)
+    storage = get_storage()
+    if not key or not storage.exists(key):
+        raise HTTPException(status_code=404, detail="No archived report found. Generate one first.")
+    filename = os.path.basename(key)
+    media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    local_path = storage.local_path(key)
+    if local_path:
+        # Served with sendfile from the archive, no copy through Python.
+        return FileResponse(local_path, media_type=media_type, filename=filename)
+    return StreamingResponse(
+        iter_artifact(storage, key),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @router.post("/sendAggregatedEmployeeData")
 def send_report_to_managers(
-    db: Session = Depends(get_db),
     current_user=Depends(manager_required),
     idempotency_key: str = Depends(idempotency_key_dependency)
 ):
-    redis_key = f"idempotency:sendAggregatedEmployeeData:{current_user.id}:{idempotency_key}"
-    cached_result = redis_client.get(redis_key)
-    if cached_result:
-        return json.loads(cached_result)
-    try:
-        result = send_report_to_manager(current_user.email)
-        redis_client.set(redis_key, json.dumps(result), ex=3600)  # expires in 1 hour
-        return result
-    except Exception as e:
-        print(f"Error sending aggregated employee data for manager {current_user.id}: {e}")
-        traceback.print_exc()
-        return {"sent": 0, "errors": [str(e)]}
+    result = run_idempotent(
+        f"sendAggregatedEmployeeData:{current_user.id}",
+        idempotency_key,
+        lambda: enqueue_job(
+            "sendAggregatedEmployeeData", current_user.id, manager_id=current_user.id, manager_email=current_user.email
+        ),
+    )
+    return JSONResponse(status_code=202, content=result)
 
 
 @router.post("/sendPdfToEmployees")
 def send_pdf_to_employees(
-    db: Session = Depends(get_db),
     current_user=Depends(manager_required),
     idempotency_key=Depends(idempotency_key_dependency)
 ):
-    redis_key = f"idempotency:sendPdfToEmployees:{current_user.id}:{idempotency_key}"
-    cached_result = redis_client.get(redis_key)
-    if cached_result:
-        return json.loads(cached_result)
-    try:
-        result = send_pdfs_to_employees(db, current_user.id)
-        redis_client.set(redis_key, json.dumps(result), ex=3600)  # expires in 1 hour
-        return result
-    except Exception as e:
-        print(f"Error sending PDFs to employees of manager {current_user.id}: {e}")
-        traceback.print_exc()
-        return {"sent": 0, "total": 0, "errors": [str(e)]}
+    result = run_idempotent(
+        f"sendPdfToEmployees:{current_user.id}",
+        idempotency_key,
+        lambda: enqueue_job("sendPdfToEmployees", current_user.id, manager_id=current_user.id),
+    )
+    return JSONResponse(status_code=202, content=result)
+
+
+@router.post("/runMonthlyPayroll")
+def run_monthly_payroll(
+    restart: bool = False,
+    current_user=Depends(manager_required),
+    idempotency_key=Depends(idempotency_key_dependency)
+):
+    result = run_idempotent(
+        f"runMonthlyPayroll:{current_user.id}",
+        idempotency_key,
+        lambda: enqueue_job(
+            "runMonthlyPayroll", current_user.id,
+            manager_id=current_user.id, manager_email=current_user.email, restart=restart,
+        ),
+    )
+    return JSONResponse(status_code=202, content=result)
+
+
+@router.get("/jobs/{job_id}")
+def get_job_status(job_id: str, current_user=Depends(manager_required)):
+    job = get_job(job_id)
+    if not job or job["owner_id"] != current_user.id:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
@@ -9,4 +9,5 @@ class SalarySlipCreate(BaseModel):
     working_days: int
     vacation_days: int
     bonuses: Optional[float] = 0.0
-    total_salary: float
+    # Computed by the payroll engine when omitted.
+    total_salary: Optional[float] = None
@@ -0,0 +1,62 @@
+"""Salary slip rendering throughput: drawing the static layout per slip vs a form XObject.
+
+    python benchmarks/bench_pdf_render.py [--slips 500]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import pdf_generator  # noqa: E402
+
+
+def _slip(i):
+    return {
+        "first_name": "First", "last_name": f"Last{i}", "employee_id": f"E{i:05d}", "cnp": f"1900101{i:06d}",
+        "email": f"employee{i}@example.com", "month": date.today().replace(day=1), "working_days": 20,
+        "vacation_days": 1, "bonuses": Decimal("100.00"), "base_salary": Decimal("4200.00"),
+        "total_salary": Decimal("4300.00"),
+    }
+
+
+def _rate(slips):
+    start = time.perf_counter()
+    for data in slips:
+        pdf_generator.render_salary_pdf(data)
+    return len(slips) / (time.perf_counter() - start)
+
+
+_draw_static_layout = pdf_generator._draw_static_layout
+
+
+def _draw_layout_as_form(c):
+    # The public ReportLab alternative: define the layout once per document, reference it.
+    c.beginForm("slip_layout")
+    _draw_static_layout(c)
+    c.endForm()
+    c.doForm("slip_layout")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--slips", type=int, default=500)
+    args = parser.parse_args()
+    slips = [_slip(i) for i in range(args.slips)]
+
+    pdf_generator.render_salary_pdf(slips[0])  # warm up fonts and imports outside the timing
+    redrawn = _rate(slips)
+    pdf_generator._draw_static_layout = _draw_layout_as_form
+    try:
+        form = _rate(slips)
+    finally:
+        pdf_generator._draw_static_layout = _draw_static_layout
+    print(f"redraw static layout: {redrawn:8.1f} slips/s")
+    print(f"form XObject layout:  {form:8.1f} slips/s  ({form / redrawn:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Query plans for the salary_slip/employee hot paths with and without the hot path indexes.
+
+Seeds a scratch schema in the configured PostgreSQL database (DB_* variables, or
+--url), runs EXPLAIN ANALYZE on the lookups used by the PDF, report, slip listing
+and reports_service, then builds the indexes from revision 7c96b2de9321 and
+explains them again. The scratch schema is dropped afterwards.
+
+    python benchmarks/explain_hot_paths.py --employees 50000 --months 24
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text  # noqa: E402
+from db.session import DATABASE_URL  # noqa: E402
+from models.models import Base, Employee, Role, SalarySlip, User  # noqa: E402
+
+SCHEMA = "bench_hot_paths"
+HOT_PATH_INDEXES = ("ix_salary_slip_employee_id_month", "ix_employee_manager_id", "ix_employee_user_id", "ix_user_role_id")
+
+QUERIES = {
+    # pdf_generator.load_salary_pdf_data: the employee's latest slip this month.
+    "latest slip for one employee": """
+        SELECT * FROM salary_slip
+        WHERE employee_id = :employee_id AND month >= date_trunc('month', current_date)
+        ORDER BY month DESC LIMIT 1
+    """,
+    # salary_slip listing: newest first, keyset-paginated.
+    "slip history for one employee": """
+        SELECT id, month, base_salary, working_days, vacation_days, bonuses, total_salary
+        FROM salary_slip WHERE employee_id = :employee_id
+        ORDER BY month DESC, id DESC LIMIT 50
+    """,
+    # reports_service: Employee.manager_id == manager_id.
+    "employees of one manager": """
+        SELECT id FROM employee WHERE manager_id = :manager_id ORDER BY id
+    """,
+    # Latest current-month slip per employee of a team (DISTINCT ON), as in the summary refresh.
+    "latest slip per team member": """
+        SELECT DISTINCT ON (s.employee_id) s.employee_id, s.total_salary, s.working_days, s.vacation_days, s.bonuses
+        FROM salary_slip s JOIN employee e ON e.id = s.employee_id
+        WHERE e.manager_id = :manager_id AND s.month >= date_trunc('month', current_date)
+        ORDER BY s.employee_id, s.month DESC, s.id DESC
+    """,
+}
+
+
+def _seed(conn, managers, employees, months):
+    conn.execute(text("""
+        INSERT INTO "user" (id, username, email, password_hash)
+        SELECT g, 'manager' || g, 'manager' || g || '@example.com', 'x' FROM generate_series(1, :managers) g
+    """), {"managers": managers})
+    conn.execute(text("""
+        INSERT INTO employee (id, employee_id, first_name, last_name, cnp, email, manager_id)
+        SELECT g, 'E' || g, 'First', 'Last' || g, 'cnp' || g, 'employee' || g || '@example.com', 1 + g % :managers
+        FROM generate_series(1, :employees) g
+    """), {"managers": managers, "employees": employees})
+    conn.execute(text("""
+        INSERT INTO salary_slip (employee_id, month, base_salary, working_days, vacation_days, bonuses, total_salary)
+        SELECT e, (date_trunc('month', current_date) - make_interval(months => m))::date, 4200, 20, 1, 100, 4300
+        FROM generate_series(1, :employees) e, generate_series(0, :months - 1) m
+    """), {"employees": employees, "months": months})
+
+
+def _explain(conn, params):
+    conn.execute(text("ANALYZE"))
+    for name, sql in QUERIES.items():
+        plan = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"), params).scalars().all()
+        print(f"-- {name}")
+        for line in plan:
+            print(f"   {line}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=DATABASE_URL)
+    parser.add_argument("--managers", type=int, default=500)
+    parser.add_argument("--employees", type=int, default=50000)
+    parser.add_argument("--months", type=int, default=24)
+    args = parser.parse_args()
+    params = {"employee_id": args.employees // 2, "manager_id": args.managers // 2}
+    tables = [table.__table__ for table in (Role, User, Employee, SalarySlip)]
+    hot_path_indexes = [index for table in tables for index in table.indexes if index.name in HOT_PATH_INDEXES]
+
+    engine = create_engine(args.url, isolation_level="AUTOCOMMIT")
+    with engine.connect() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        conn.execute(text(f"SET search_path TO {SCHEMA}"))
+        try:
+            Base.metadata.create_all(conn, tables=tables)
+            for index in hot_path_indexes:
+                index.drop(conn)
+            start = time.perf_counter()
+            _seed(conn, args.managers, args.employees, args.months)
+            print(f"Seeded {args.employees} employees x {args.months} months in {time.perf_counter() - start:.1f}s\n")
+
+            print("== Without hot path indexes")
+            _explain(conn, params)
+            start = time.perf_counter()
+            for index in hot_path_indexes:
+                index.create(conn)
+            print(f"\n== With hot path indexes (built in {time.perf_counter() - start:.1f}s)")
+            _explain(conn, params)
+        finally:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
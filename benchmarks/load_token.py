@@ -0,0 +1,106 @@
+"""Load test for POST /token: throughput and latency percentiles under concurrency.
+
+Against a running server:
+    python benchmarks/load_token.py --url http://localhost:8000 --username alice --password secret
+
+Without --url an in-process server is started on a throwaway SQLite database with
+one seeded user, so only password hashing and the request path are measured:
+    python benchmarks/load_token.py --requests 400 --concurrency 32
+"""
+import argparse
+import http.client
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("LOG_FILE", os.path.join(tempfile.gettempdir(), "load_token.log"))
+
+
+def _start_local_server():
+    import uvicorn
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+    from core.auth import get_db, pwd_context
+    from main import app
+    from models.models import Base, User
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    with session_factory() as session:
+        session.add(User(username="loadtest", email="loadtest@example.com", password_hash=pwd_context.hash("loadtest")))
+        session.commit()
+
+    def get_test_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = get_test_db
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}", "loadtest", "loadtest"
+
+
+def _percentile(values, pct):
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url")
+    parser.add_argument("--username")
+    parser.add_argument("--password")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    if args.url:
+        url, username, password = args.url, args.username, args.password
+    else:
+        url, username, password = _start_local_server()
+
+    target = urlsplit(url)
+    body = urlencode({"username": username, "password": password})
+    headers = {"Content-Type": "application/x-www-form-urlencoded"}
+    local = threading.local()
+
+    def login(_):
+        # One keep-alive connection per client thread.
+        if not hasattr(local, "conn"):
+            conn_class = http.client.HTTPSConnection if target.scheme == "https" else http.client.HTTPConnection
+            local.conn = conn_class(target.netloc)
+        start = time.perf_counter()
+        local.conn.request("POST", f"{target.path.rstrip('/')}/token", body=body, headers=headers)
+        response = local.conn.getresponse()
+        response.read()
+        return time.perf_counter() - start, response.status
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(login, range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency * 1000 for latency, _ in results)
+    failures = sum(1 for _, status in results if status != 200)
+    print(f"{args.requests} logins, concurrency {args.concurrency}, {failures} failed")
+    print(f"throughput: {args.requests / elapsed:.1f} req/s")
+    print(f"latency ms: p50 {_percentile(latencies, 50):.1f}  p95 {_percentile(latencies, 95):.1f}  "
+          f"p99 {_percentile(latencies, 99):.1f}  max {latencies[-1]:.1f}")
+
+
+if __name__ == "__main__":
+    main()
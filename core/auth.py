@@ -1,20 +1,60 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from db.session import SessionLocal
-from models.models import User
+from db.session import AsyncSessionLocal, SessionLocal
+from models.models import User, Role
 from passlib.context import CryptContext
+from cachetools import TTLCache
+from typing import NamedTuple, Optional
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import jwt
 import os
+import threading
 from datetime import datetime, timedelta
 
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "supersecretkey")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
+PRINCIPAL_CACHE_TTL = int(os.getenv("PRINCIPAL_CACHE_TTL", 30))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", 1024))
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+PASSWORD_HASH_BULK_WORKERS = int(os.getenv("PASSWORD_HASH_BULK_WORKERS", os.cpu_count() or 1))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Pinning min/max to the configured cost makes any hash with a different cost
+# "need update", so it is rehashed on the next successful login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+# bcrypt releases the GIL, so a small dedicated pool bounds how many cores hashing can
+# take without occupying the event loop or the request threadpool.
+_password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+# Bulk imports hash on their own pool so a few thousand queued hashes never delay logins.
+_bulk_password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_BULK_WORKERS, thread_name_prefix="password-hash-bulk")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/token")
 
+
+class Principal(NamedTuple):
+    id: int
+    username: str
+    email: str
+    role: Optional[str]
+
+
+# Resolved principals keyed by token subject (username). Entries expire after
+# PRINCIPAL_CACHE_TTL seconds and the least recently used ones are evicted first.
+_principal_cache = TTLCache(maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL)
+_principal_cache_lock = threading.Lock()
+_principal_cache_stats = {"hits": 0, "misses": 0}
+
 def get_db():
     db = SessionLocal()
     try:
@@ -22,14 +62,35 @@ def get_db():
     finally:
         db.close()
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def hash_password(password: str) -> str:
+    return _password_executor.submit(pwd_context.hash, password).result()
+
+
+def hash_passwords(passwords: list) -> list:
+    return list(_bulk_password_executor.map(pwd_context.hash, passwords))
+
+
+async def verify_and_update_password(plain_password, hashed_password):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, pwd_context.verify_and_update, plain_password, hashed_password)
 
 
-def authenticate_user(db: Session, username: str, password: str):
-    user = db.query(User).filter(User.username == username).first()
-    if not user or not verify_password(password, user.password_hash):
+async def authenticate_user_async(db: Session, username: str, password: str):
+    user = await run_in_threadpool(lambda: db.query(User).filter(User.username == username).first())
+    if not user:
         return None
+    valid, new_hash = await verify_and_update_password(password, user.password_hash)
+    if not valid:
+        return None
+    if new_hash:
+        user.password_hash = new_hash
+        await run_in_threadpool(db.commit)
     return user
 
 
@@ -40,27 +101,132 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
+
+def _token_subject(token: str) -> str:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
     except Exception:
-        raise credentials_exception
-    user = db.query(User).filter(User.username == username).first()
-    if user is None:
-        raise credentials_exception
-    return user
+        raise _credentials_exception()
+    if username is None:
+        raise _credentials_exception()
+    return username
+
+
+def _cached_principal(username: str) -> Optional[Principal]:
+    with _principal_cache_lock:
+        principal = _principal_cache.get(username)
+        _principal_cache_stats["hits" if principal else "misses"] += 1
+    return principal
+
+
+def _cache_principal(username: str, principal: Optional[Principal]) -> Principal:
+    if principal is None:
+        raise _credentials_exception()
+    with _principal_cache_lock:
+        _principal_cache[username] = principal
+    return principal
+
+
+def get_current_user(request: Request, token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    username = _token_subject(token)
+    principal = _cached_principal(username)
+    if principal is None:
+        principal = _cache_principal(username, load_principal(db, username))
+    request.state.user_id = principal.id
+    return principal
+
+
+async def get_current_user_async(request: Request, token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    username = _token_subject(token)
+    principal = _cached_principal(username)
+    if principal is None:
+        principal = _cache_principal(username, await load_principal_async(db, username))
+    request.state.user_id = principal.id
+    return principal
+
+
+def _principal_statement(username: str):
+    return (
+        select(User.id, User.username, User.email, Role.name)
+        .outerjoin(Role, User.role_id == Role.id)
+        .where(User.username == username)
+    )
+
+
+def load_principal(db: Session, username: str) -> Optional[Principal]:
+    row = db.execute(_principal_statement(username)).first()
+    return Principal(*row) if row else None
+
+
+async def load_principal_async(db: AsyncSession, username: str) -> Optional[Principal]:
+    row = (await db.execute(_principal_statement(username))).first()
+    return Principal(*row) if row else None
+
+
+def invalidate_principal(user_id: int = None):
+    with _principal_cache_lock:
+        if user_id is None:
+            _principal_cache.clear()
+            return
+        for username, principal in list(_principal_cache.items()):
+            if principal.id == user_id:
+                del _principal_cache[username]
+
+
+def principal_cache_stats() -> dict:
+    with _principal_cache_lock:
+        return {
+            "hits": _principal_cache_stats["hits"],
+            "misses": _principal_cache_stats["misses"],
+            "size": len(_principal_cache),
+            "max_size": _principal_cache.maxsize,
+            "ttl_seconds": _principal_cache.ttl,
+        }
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_principal_invalidations(session, flush_context):
+    # Flushed changes are only evicted once committed: evicting at flush would let a
+    # concurrent request re-cache the old row before the commit. None means every user.
+    pending = session.info.setdefault("principal_invalidations", set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            pending.add(obj.id)
+        elif isinstance(obj, Role):
+            pending.add(None)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_principals(session):
+    pending = session.info.pop("principal_invalidations", None) or ()
+    if None in pending:
+        invalidate_principal()
+        return
+    for user_id in pending:
+        invalidate_principal(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_principal_invalidations(session):
+    session.info.pop("principal_invalidations", None)
+
+
+def manager_required(current_user: Principal = Depends(get_current_user)):
+    if current_user.role == "manager":
+        return current_user
+    raise HTTPException(status_code=403, detail="Managers only.")
 
 
-def manager_required(current_user: User = Depends(get_current_user)):
-    if current_user.role and current_user.role.name == "manager":
+async def manager_required_async(current_user: Principal = Depends(get_current_user_async)):
+    # Same check as manager_required, resolved on the event loop for async routes.
+    if current_user.role == "manager":
         return current_user
     raise HTTPException(status_code=403, detail="Managers only.")
@@ -1,19 +1,88 @@
 from fastapi import Request, HTTPException
 from starlette.status import HTTP_409_CONFLICT
-from typing import Set
-import threading
+from core.redis_client import redis_client
+import redis
+import json
+import os
+import time
 
 
-_idempotency_keys: Set[str] = set()
-_lock = threading.Lock()
+IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", 3600))
+IDEMPOTENCY_FAILED_TTL = int(os.getenv("IDEMPOTENCY_FAILED_TTL", 300))
+# An in-progress claim expires after this long, so a crashed request cannot block its key forever.
+IDEMPOTENCY_LOCK_TTL = int(os.getenv("IDEMPOTENCY_LOCK_TTL", 300))
+IDEMPOTENCY_WAIT_TIMEOUT = float(os.getenv("IDEMPOTENCY_WAIT_TIMEOUT", 30))
+IDEMPOTENCY_POLL_INTERVAL = 0.05
+
+_IN_PROGRESS = json.dumps({"state": "in_progress"})
+
 
 async def idempotency_key_dependency(request: Request):
     key = request.headers.get("Idempotency-Key")
     if not key:
         raise HTTPException(status_code=400, detail="Missing Idempotency-Key header")
-    with _lock:
-        if key in _idempotency_keys:
-            raise HTTPException(status_code=HTTP_409_CONFLICT, detail="Duplicate request: Idempotency-Key already used")
-        _idempotency_keys.add(key)
- 
     return key
+
+
+def _store(redis_key: str, record: dict, ttl: int):
+    redis_client.set(redis_key, json.dumps(record), ex=ttl)
+
+
+def _execute(redis_key: str, fn):
+    try:
+        result = fn()
+    except HTTPException as e:
+        _store(redis_key, {"state": "failed", "status_code": e.status_code, "error": e.detail}, IDEMPOTENCY_FAILED_TTL)
+        raise
+    except Exception as e:
+        _store(redis_key, {"state": "failed", "status_code": 500, "error": str(e)}, IDEMPOTENCY_FAILED_TTL)
+        raise
+    _store(redis_key, {"state": "completed", "response": result}, IDEMPOTENCY_TTL)
+    return result
+
+
+def _reclaim_failed(redis_key: str, seen: bytes) -> bool:
+    # Atomically swap a failed record for a fresh in-progress claim; only one retry wins.
+    with redis_client.pipeline() as pipe:
+        try:
+            pipe.watch(redis_key)
+            if pipe.get(redis_key) != seen:
+                return False
+            pipe.multi()
+            pipe.set(redis_key, _IN_PROGRESS, ex=IDEMPOTENCY_LOCK_TTL)
+            pipe.execute()
+            return True
+        except redis.WatchError:
+            return False
+
+
+def run_idempotent(scope: str, key: str, fn):
+    # Runs fn at most once per (scope, Idempotency-Key) across all workers. A repeat of a
+    # completed request gets the stored response; a duplicate arriving while the original
+    # is still running waits for it and gets the same response or error; a new attempt
+    # after a failure runs again.
+    redis_key = f"idempotency:{scope}:{key}"
+    waited = False
+    deadline = time.monotonic() + IDEMPOTENCY_WAIT_TIMEOUT
+    while True:
+        if redis_client.set(redis_key, _IN_PROGRESS, nx=True, ex=IDEMPOTENCY_LOCK_TTL):
+            return _execute(redis_key, fn)
+        raw = redis_client.get(redis_key)
+        if raw is None:
+            continue
+        record = json.loads(raw)
+        if record["state"] == "completed":
+            return record["response"]
+        if record["state"] == "failed":
+            if waited:
+                raise HTTPException(status_code=record["status_code"], detail=record["error"])
+            if _reclaim_failed(redis_key, raw):
+                return _execute(redis_key, fn)
+            continue
+        waited = True
+        if time.monotonic() >= deadline:
+            raise HTTPException(
+                status_code=HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is still being processed",
+            )
+        time.sleep(IDEMPOTENCY_POLL_INTERVAL)
@@ -0,0 +1,171 @@
+import json
+import os
+import threading
+import traceback
+import uuid
+from datetime import datetime
+from core.redis_client import redis_client
+from db.session import SessionLocal
+
+JOB_QUEUE_KEY = "jobs:queue"
+JOB_WORKERS_KEY = "jobs:workers"
+JOB_TTL = int(os.getenv("JOB_TTL", 86400))
+JOB_POLL_TIMEOUT = int(os.getenv("JOB_POLL_TIMEOUT", 5))
+# A worker that hasn't refreshed its heartbeat for this long is considered dead
+# and the jobs it had taken are recovered by the other workers.
+JOB_WORKER_HEARTBEAT_TTL = int(os.getenv("JOB_WORKER_HEARTBEAT_TTL", 30))
+
+_job_handlers = {}
+
+
+def job_handler(kind: str):
+    # Registers fn(db, progress, **params) as the executor for jobs of this kind.
+    def decorator(fn):
+        _job_handlers[kind] = fn
+        return fn
+    return decorator
+
+
+def _job_key(job_id: str) -> str:
+    return f"job:{job_id}"
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat()
+
+
+def enqueue_job(kind: str, owner_id: int, **params) -> dict:
+    job_id = uuid.uuid4().hex
+    key = _job_key(job_id)
+    pipe = redis_client.pipeline()
+    pipe.hset(key, mapping={
+        "id": job_id,
+        "kind": kind,
+        "owner_id": owner_id,
+        "status": "queued",
+        "params": json.dumps(params),
+        "done": 0,
+        "total": 0,
+        "created_at": _now(),
+    })
+    pipe.expire(key, JOB_TTL)
+    pipe.lpush(JOB_QUEUE_KEY, job_id)
+    pipe.execute()
+    return {"job_id": job_id, "status": "queued"}
+
+
+def get_job(job_id: str):
+    raw = redis_client.hgetall(_job_key(job_id))
+    if not raw:
+        return None
+    job = {k.decode(): v.decode() for k, v in raw.items()}
+    return {
+        "job_id": job["id"],
+        "kind": job["kind"],
+        "owner_id": int(job["owner_id"]),
+        "status": job["status"],
+        "progress": {"done": int(job["done"]), "total": int(job["total"])},
+        "result": json.loads(job["result"]) if "result" in job else None,
+        "error": job.get("error"),
+        "created_at": job["created_at"],
+        "started_at": job.get("started_at"),
+        "finished_at": job.get("finished_at"),
+    }
+
+
+def update_job(job_id: str, **fields):
+    redis_client.hset(_job_key(job_id), mapping=fields)
+
+
+def run_job(job_id: str):
+    key = _job_key(job_id)
+    kind = redis_client.hget(key, "kind")
+    if kind is None:
+        return
+    kind = kind.decode()
+    handler = _job_handlers.get(kind)
+    if handler is None:
+        update_job(job_id, status="failed", error=f"Unknown job kind: {kind}", finished_at=_now())
+        return
+    params = json.loads(redis_client.hget(key, "params") or "{}")
+
+    def progress(done, total):
+        update_job(job_id, done=done, total=total)
+
+    update_job(job_id, status="running", started_at=_now())
+    db = SessionLocal()
+    try:
+        result = handler(db, progress, **params)
+        update_job(job_id, status="completed", result=json.dumps(result), finished_at=_now())
+    except Exception as e:
+        traceback.print_exc()
+        db.rollback()
+        update_job(job_id, status="failed", error=str(e), finished_at=_now())
+    finally:
+        db.close()
+
+
+def _processing_key(worker_id: str) -> str:
+    return f"jobs:processing:{worker_id}"
+
+
+def _heartbeat_key(worker_id: str) -> str:
+    return f"jobs:worker:{worker_id}"
+
+
+def _beat(worker_id: str):
+    redis_client.set(_heartbeat_key(worker_id), 1, ex=JOB_WORKER_HEARTBEAT_TTL)
+
+
+def _heartbeat(worker_id: str, stop: threading.Event):
+    while not stop.wait(JOB_WORKER_HEARTBEAT_TTL / 3):
+        _beat(worker_id)
+
+
+def recover_jobs():
+    # Jobs held by a worker whose heartbeat expired: ones it never started go back
+    # on the queue; ones it was running are failed, since handlers may already
+    # have sent mail and are not safe to run twice.
+    for worker_id in redis_client.smembers(JOB_WORKERS_KEY):
+        worker_id = worker_id.decode()
+        # SREM decides which of several recovering workers handles this one.
+        if redis_client.exists(_heartbeat_key(worker_id)) or not redis_client.srem(JOB_WORKERS_KEY, worker_id):
+            continue
+        processing = _processing_key(worker_id)
+        while True:
+            job_id = redis_client.lindex(processing, -1)
+            if job_id is None:
+                break
+            status = redis_client.hget(_job_key(job_id.decode()), "status")
+            if status == b"queued":
+                redis_client.rpoplpush(processing, JOB_QUEUE_KEY)
+                continue
+            if status == b"running":
+                update_job(job_id.decode(), status="failed", error="The worker running this job stopped.", finished_at=_now())
+            redis_client.rpop(processing)
+
+
+def run_worker():
+    # Each job id is moved atomically from the queue to this worker's processing
+    # list and only removed once the job has finished, so a crashed worker's
+    # jobs can be recovered instead of being lost.
+    worker_id = uuid.uuid4().hex
+    stop = threading.Event()
+    _beat(worker_id)
+    redis_client.sadd(JOB_WORKERS_KEY, worker_id)
+    threading.Thread(target=_heartbeat, args=(worker_id, stop), name="job-heartbeat", daemon=True).start()
+    processing = _processing_key(worker_id)
+    print("Job worker started, waiting for jobs...")
+    try:
+        while True:
+            job_id = redis_client.blmove(JOB_QUEUE_KEY, processing, JOB_POLL_TIMEOUT, "RIGHT", "LEFT")
+            if job_id is None:
+                recover_jobs()
+                continue
+            try:
+                run_job(job_id.decode())
+            finally:
+                redis_client.lrem(processing, 1, job_id)
+    finally:
+        stop.set()
+        redis_client.delete(_heartbeat_key(worker_id))
@@ -1,23 +1,202 @@
+import atexit
+import json
 import logging
+import os
+import queue
+import random
+import threading
 import time
-from fastapi import Request
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, RotatingFileHandler
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s %(levelname)s %(message)s',
-    filename='app.log', 
-    filemode='a'         
-)
+LOG_FILE = os.getenv("LOG_FILE", "app.log")
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 50 * 1024 * 1024))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", 5))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", 500))
+# Above LOG_SAMPLE_QPS requests in the current second, successful requests are
+# only logged with probability LOG_SAMPLE_RATE. Errors and slow requests are always kept.
+LOG_SAMPLE_QPS = int(os.getenv("LOG_SAMPLE_QPS", 200))
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", 0.1))
+LOG_SLOW_REQUEST_MS = float(os.getenv("LOG_SLOW_REQUEST_MS", 1000))
+
+_STOP = object()
+
+_log_stats = {"dropped": 0, "sampled_out": 0}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        return json.dumps(entry, default=str)
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    def enqueue(self, record):
+        # A full queue means the writer can't keep up; dropping a line beats stalling the event loop.
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _log_stats["dropped"] += 1
+
+
+class _BatchingFileHandler(RotatingFileHandler):
+    def emit_batch(self, records):
+        data = "".join(self.format(record) + self.terminator for record in records)
+        with self.lock:
+            if self.stream is None:
+                self.stream = self._open()
+            if self.maxBytes and self.stream.tell() and self.stream.tell() + len(data) >= self.maxBytes:
+                self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+            self.stream.write(data)
+            self.stream.flush()
+
+
+class _LogWriter(threading.Thread):
+    # Drains the log queue on its own thread, writing whatever has piled up
+    # (up to batch_size records) with one write and one flush.
+
+    def __init__(self, log_queue, handler, batch_size):
+        super().__init__(name="log-writer", daemon=True)
+        self.queue = log_queue
+        self.handler = handler
+        self.batch_size = batch_size
+
+    def run(self):
+        stopping = False
+        while not stopping:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if _STOP in batch:
+                stopping = True
+                batch = [record for record in batch if record is not _STOP]
+            if batch:
+                try:
+                    self.handler.emit_batch(batch)
+                except Exception:
+                    self.handler.handleError(batch[0])
+
+    def stop(self):
+        self.queue.put(_STOP)
+        self.join(timeout=5)
+        self.handler.close()
+
+
+def _configure_logging():
+    log_queue = queue.Queue(LOG_QUEUE_SIZE)
+    file_handler = _BatchingFileHandler(LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, delay=True)
+    file_handler.setFormatter(JsonFormatter())
+    writer = _LogWriter(log_queue, file_handler, LOG_BATCH_SIZE)
+    writer.start()
+    atexit.register(writer.stop)
+
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(_NonBlockingQueueHandler(log_queue))
+    return writer
+
+
+_writer = _configure_logging()
 
 sqlalchemy_logger = logging.getLogger('sqlalchemy.engine')
 sqlalchemy_logger.setLevel(logging.ERROR)
 sqlalchemy_logger.propagate = False
 
+request_logger = logging.getLogger("app.requests")
+
+
+class _RequestSampler:
+    def __init__(self, qps_threshold, rate):
+        self.qps_threshold = qps_threshold
+        self.rate = rate
+        self._second = 0
+        self._count = 0
+
+    def sample_rate(self):
+        # Called from the event loop only, so the counters need no lock.
+        now = int(time.monotonic())
+        if now != self._second:
+            self._second = now
+            self._count = 0
+        self._count += 1
+        return 1.0 if self._count <= self.qps_threshold else self.rate
+
+
+_sampler = _RequestSampler(LOG_SAMPLE_QPS, LOG_SAMPLE_RATE)
+
+
+def log_stats():
+    return {**_log_stats, "queued": _writer.queue.qsize()}
+
+
+def _header(scope, name: bytes):
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class RequestLoggingMiddleware:
+    # Plain ASGI middleware (see core.metrics.RequestMetricsMiddleware): tags the
+    # response with X-Request-ID and logs one line per request.
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start_time = time.perf_counter()
+        request_id = _header(scope, b"x-request-id") or uuid.uuid4().hex
+        # Same dict as request.state, so handlers and dependencies can read and add to it.
+        state = scope.setdefault("state", {})
+        state["request_id"] = request_id
+        status = 500
+
+        async def send_with_request_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-request-id", request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            duration = (time.perf_counter() - start_time) * 1000
+            rate = _sampler.sample_rate()
+            if status >= 400 or duration >= LOG_SLOW_REQUEST_MS:
+                rate = 1.0
+            if rate < 1.0 and random.random() >= rate:
+                _log_stats["sampled_out"] += 1
+            else:
+                request_logger.info("request", extra={"fields": {
+                    "request_id": request_id,
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": getattr(scope.get("route"), "path", None),
+                    "status": status,
+                    "duration_ms": round(duration, 2),
+                    "user_id": state.get("user_id"),
+                    "sample_rate": rate,
+                }})
+
+
 def setup_request_logging(app):
-    @app.middleware("http")
-    async def log_requests(request: Request, call_next):
-        start_time = time.time()
-        response = await call_next(request)
-        duration = (time.time() - start_time) * 1000
-        logging.info(f"{request.method} {request.url.path} - Status: {response.status_code} - {duration:.2f}ms")
-        return response
+    app.add_middleware(RequestLoggingMiddleware)
@@ -0,0 +1,143 @@
+import os
+import tempfile
+import threading
+from contextlib import closing, contextmanager
+from datetime import date
+
+ARCHIVE_BACKEND = os.getenv("ARCHIVE_BACKEND", "local")
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", os.path.join(os.getcwd(), "archive"))
+ARCHIVE_S3_BUCKET = os.getenv("ARCHIVE_S3_BUCKET", "salary-archive")
+ARCHIVE_S3_PREFIX = os.getenv("ARCHIVE_S3_PREFIX", "")
+# Set to the MinIO (or other S3-compatible) URL; unset means AWS S3.
+ARCHIVE_S3_ENDPOINT_URL = os.getenv("ARCHIVE_S3_ENDPOINT_URL") or None
+ARCHIVE_S3_REGION = os.getenv("ARCHIVE_S3_REGION") or None
+ARCHIVE_READ_CHUNK_SIZE = 1024 * 1024
+
+
+def archive_key(manager_id, filename: str, day: date = None) -> str:
+    # Sharded as year/month/manager so no directory (or listing prefix) grows without bound.
+    day = day or date.today()
+    return f"{day:%Y}/{day:%m}/{manager_id}/{filename}"
+
+
+class LocalStorage:
+    # Keys are paths relative to root. Absolute keys (manifest rows written before
+    # the sharded layout) resolve to themselves, so old artifacts stay readable.
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def local_path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.local_path(key))
+
+    @contextmanager
+    def staged_path(self, key: str):
+        # Yields a path to write the artifact to. It is published atomically under key
+        # when the block succeeds, so readers never see a half-written file.
+        path = self.local_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            yield tmp_path
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def put_bytes(self, key: str, data: bytes):
+        with self.staged_path(key) as tmp_path:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+
+    def get_bytes(self, key: str) -> bytes:
+        with open(self.local_path(key), "rb") as f:
+            return f.read()
+
+    def open(self, key: str):
+        return open(self.local_path(key), "rb")
+
+
+class S3Storage:
+    # Any S3-compatible store (AWS S3, MinIO). boto3 is only needed when this backend is used.
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: str = None, region: str = None):
+        try:
+            import boto3
+            from boto3.s3.transfer import TransferConfig
+        except ImportError as e:
+            raise RuntimeError("ARCHIVE_BACKEND=s3 requires boto3 (pip install boto3)") from e
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.client = boto3.client("s3", endpoint_url=endpoint_url, region_name=region)
+        # Large artifacts are uploaded from disk in parts instead of being read into memory.
+        self.transfer_config = TransferConfig(multipart_threshold=8 * 1024 * 1024, multipart_chunksize=8 * 1024 * 1024)
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def local_path(self, key: str):
+        return None
+
+    def exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    @contextmanager
+    def staged_path(self, key: str):
+        fd, tmp_path = tempfile.mkstemp(suffix=os.path.splitext(key)[1])
+        os.close(fd)
+        try:
+            yield tmp_path
+            self.client.upload_file(tmp_path, self.bucket, self._object_key(key), Config=self.transfer_config)
+        finally:
+            os.remove(tmp_path)
+
+    def put_bytes(self, key: str, data: bytes):
+        self.client.put_object(Bucket=self.bucket, Key=self._object_key(key), Body=data)
+
+    def get_bytes(self, key: str) -> bytes:
+        return self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))["Body"].read()
+
+    def open(self, key: str):
+        # Streaming body; read it in chunks rather than all at once.
+        return self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))["Body"]
+
+
+def iter_artifact(storage, key: str):
+    with closing(storage.open(key)) as f:
+        while True:
+            chunk = f.read(ARCHIVE_READ_CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+
+def create_storage(backend: str = ARCHIVE_BACKEND):
+    if backend == "local":
+        return LocalStorage(ARCHIVE_DIR)
+    if backend == "s3":
+        return S3Storage(ARCHIVE_S3_BUCKET, ARCHIVE_S3_PREFIX, ARCHIVE_S3_ENDPOINT_URL, ARCHIVE_S3_REGION)
+    raise ValueError(f"Unknown ARCHIVE_BACKEND: {backend}")
+
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def get_storage():
+    # One backend per process, created lazily on first use.
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = create_storage()
+    return _storage
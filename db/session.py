@@ -1,6 +1,11 @@
 import os
+import threading
+import time
 from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from dotenv import load_dotenv
 
 
@@ -12,7 +17,116 @@ DB_HOST = os.getenv('DB_HOST', 'localhost')
 DB_PORT = os.getenv('DB_PORT', '5432')
 DB_NAME = os.getenv('DB_NAME')
 
+DB_ECHO = os.getenv('DB_ECHO', 'false').lower() == 'true'
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 30))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))
+DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 0))
+# The async engine keeps its own pool, so these add to the sync pool's connection budget.
+DB_ASYNC_POOL_SIZE = int(os.getenv('DB_ASYNC_POOL_SIZE', DB_POOL_SIZE))
+DB_ASYNC_MAX_OVERFLOW = int(os.getenv('DB_ASYNC_MAX_OVERFLOW', DB_MAX_OVERFLOW))
+
 DATABASE_URL = f"postgresql+psycopg2://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+ASYNC_DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+class _WaitInstrumentedPool:
+    # Records how long each checkout waited for a connection (including opening a new
+    # one). Stats live on the pool and carry over when SQLAlchemy recreates it.
+
+    def __init__(self, creator, pool_size=5, max_overflow=10, **kw):
+        super().__init__(creator, pool_size=pool_size, max_overflow=max_overflow, **kw)
+        self.max_overflow_limit = max_overflow
+        self._wait_lock = threading.Lock()
+        self._wait_stats = {"checkouts": 0, "timeouts": 0, "wait_total_ms": 0.0, "wait_max_ms": 0.0}
+
+    def recreate(self):
+        pool = super().recreate()
+        pool._wait_lock, pool._wait_stats = self._wait_lock, self._wait_stats
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._wait_lock:
+                self._wait_stats["timeouts"] += 1
+            raise
+        finally:
+            waited = (time.perf_counter() - start) * 1000
+            with self._wait_lock:
+                self._wait_stats["checkouts"] += 1
+                self._wait_stats["wait_total_ms"] += waited
+                self._wait_stats["wait_max_ms"] = max(self._wait_stats["wait_max_ms"], waited)
+
+    def wait_stats(self) -> dict:
+        with self._wait_lock:
+            return dict(self._wait_stats)
+
+
+class InstrumentedQueuePool(_WaitInstrumentedPool, QueuePool):
+    pass
+
 
-engine = create_engine(DATABASE_URL, echo=True)
+class InstrumentedAsyncQueuePool(_WaitInstrumentedPool, AsyncAdaptedQueuePool):
+    pass
+
+
+def create_db_engine(url: str = DATABASE_URL):
+    connect_args = {}
+    if DB_STATEMENT_TIMEOUT_MS:
+        connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+    return create_engine(
+        url,
+        echo=DB_ECHO,
+        poolclass=InstrumentedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args=connect_args,
+    )
+
+
+def create_async_db_engine(url: str = ASYNC_DATABASE_URL):
+    connect_args = {}
+    if DB_STATEMENT_TIMEOUT_MS:
+        connect_args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+    return create_async_engine(
+        url,
+        echo=DB_ECHO,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=DB_ASYNC_POOL_SIZE,
+        max_overflow=DB_ASYNC_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args=connect_args,
+    )
+
+
+def pool_stats(db_engine=None) -> dict:
+    pool = (db_engine or engine).pool
+    waits = pool.wait_stats()
+    return {
+        "pool_size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool.max_overflow_limit,
+        "checkouts": waits["checkouts"],
+        "timeouts": waits["timeouts"],
+        "wait_avg_ms": round(waits["wait_total_ms"] / waits["checkouts"], 3) if waits["checkouts"] else 0.0,
+        "wait_max_ms": round(waits["wait_max_ms"], 3),
+    }
+
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Used by the read-only endpoints so they run on the event loop instead of the request threadpool.
+async_engine = create_async_db_engine()
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
@@ -4,10 +4,13 @@ from api.routers import employee, salary_slip
 from api.routers import pdf
 from api.routers import send_pdf
 from api.routers import auth
+from api.routers import internal
 from core.logging import setup_request_logging
+from core.metrics import setup_metrics
 
 app = FastAPI()
 setup_request_logging(app)
+setup_metrics(app)
 
 
 app.include_router(employee.router)
@@ -15,6 +18,7 @@ app.include_router(salary_slip.router)
 app.include_router(pdf.router)
 app.include_router(send_pdf.router)
 app.include_router(auth.router)
+app.include_router(internal.router)
 
 
 if __name__ == "__main__":
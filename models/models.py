@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, Numeric, ForeignKey, TIMESTAMP, func
+from sqlalchemy import Column, Integer, String, Date, Numeric, ForeignKey, TIMESTAMP, Index, event, func, inspect, update
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -67,3 +67,67 @@ class SalarySlip(Base):
     created_at = Column(TIMESTAMP, server_default=func.now())
 
     employee = relationship('Employee', back_populates='salary_slips')
+
+
+class ArchiveEntry(Base):
+    __tablename__ = 'archive_entry'
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(50), nullable=False)
+    path = Column(String(500), nullable=False)
+    manager_id = Column(Integer, ForeignKey('user.id'))
+    employee_id = Column(Integer, ForeignKey('employee.id', ondelete='CASCADE'))
+    created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+
+
+class MonthlySalarySummary(Base):
+    # One row per employee and month holding that month's effective (latest) slip,
+    # kept current by services.salary_summary whenever slips are written.
+    __tablename__ = 'monthly_salary_summary'
+
+    employee_id = Column(Integer, ForeignKey('employee.id', ondelete='CASCADE'), primary_key=True)
+    month = Column(Date, primary_key=True)
+    manager_id = Column(Integer, ForeignKey('user.id'))
+    department = Column(String(100))
+    salary_slip_id = Column(Integer, ForeignKey('salary_slip.id', ondelete='CASCADE'), nullable=False)
+    base_salary = Column(Numeric(12, 2), nullable=False)
+    working_days = Column(Integer, nullable=False)
+    vacation_days = Column(Integer, nullable=False)
+    bonuses = Column(Numeric(12, 2))
+    total_salary = Column(Numeric(12, 2), nullable=False)
+    updated_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+
+
+# Indexes for the hot access paths (see alembic revision 7c96b2de9321).
+Index('ix_user_role_id', User.role_id)
+Index('ix_employee_manager_id', Employee.manager_id, Employee.id)
+Index('ix_employee_user_id', Employee.user_id)
+Index(
+    'ix_salary_slip_employee_id_month',
+    SalarySlip.employee_id,
+    SalarySlip.month.desc(),
+    SalarySlip.id.desc(),
+    postgresql_include=['base_salary', 'working_days', 'vacation_days', 'bonuses', 'total_salary'],
+)
+
+# Latest-artifact lookups in the archive manifest.
+Index('ix_archive_entry_kind_employee_created', ArchiveEntry.kind, ArchiveEntry.employee_id, ArchiveEntry.created_at.desc())
+Index('ix_archive_entry_kind_manager_created', ArchiveEntry.kind, ArchiveEntry.manager_id, ArchiveEntry.created_at.desc())
+
+# Monthly summary reads by manager (reports) and by department (dashboards).
+Index('ix_monthly_salary_summary_manager_month', MonthlySalarySummary.manager_id, MonthlySalarySummary.month, MonthlySalarySummary.employee_id)
+Index('ix_monthly_salary_summary_department_month', MonthlySalarySummary.department, MonthlySalarySummary.month)
+
+
+@event.listens_for(Employee, "after_update")
+def _follow_employee_reassignment(mapper, connection, target):
+    # The summary copies manager_id and department so manager reports can filter on
+    # them alone; move the employee's rows along in the same flush when either changes.
+    state = inspect(target)
+    if not any(state.attrs[name].history.has_changes() for name in ("manager_id", "department")):
+        return
+    connection.execute(
+        update(MonthlySalarySummary)
+        .where(MonthlySalarySummary.employee_id == target.id)
+        .values(manager_id=target.manager_id, department=target.department)
+    )
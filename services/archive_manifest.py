@@ -0,0 +1,39 @@
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from models.models import ArchiveEntry
+
+SALARY_REPORT = "salary_report"
+SALARY_SLIP = "salary_slip"
+
+
+def record_artifacts(session: Session, kind: str, entries: list):
+    # entries: dicts with "path" and optionally "manager_id" / "employee_id".
+    # Added to the caller's transaction; the caller commits.
+    if entries:
+        session.execute(insert(ArchiveEntry), [{"kind": kind, **entry} for entry in entries])
+
+
+def latest_artifact(session: Session, kind: str, manager_id=None, employee_id=None):
+    query = session.query(ArchiveEntry.path).filter(ArchiveEntry.kind == kind)
+    if manager_id is not None:
+        query = query.filter(ArchiveEntry.manager_id == manager_id)
+    if employee_id is not None:
+        query = query.filter(ArchiveEntry.employee_id == employee_id)
+    row = query.order_by(ArchiveEntry.created_at.desc(), ArchiveEntry.id.desc()).first()
+    return row.path if row else None
+
+
+def latest_artifacts_for_employees(session: Session, kind: str, employee_ids) -> dict:
+    # Latest artifact path per employee in one DISTINCT ON query, keyed by Employee.id.
+    employee_ids = list(employee_ids)
+    if not employee_ids:
+        return {}
+    rows = (
+        session.query(ArchiveEntry.employee_id, ArchiveEntry.path)
+        .filter(ArchiveEntry.kind == kind)
+        .filter(ArchiveEntry.employee_id.in_(employee_ids))
+        .distinct(ArchiveEntry.employee_id)
+        .order_by(ArchiveEntry.employee_id, ArchiveEntry.created_at.desc(), ArchiveEntry.id.desc())
+        .all()
+    )
+    return {row.employee_id: row.path for row in rows}
@@ -0,0 +1,9 @@
+from pydantic import ValidationError
+
+# Rows per INSERT statement in the bulk import services.
+BULK_INSERT_CHUNK_SIZE = 5000
+
+
+def validation_message(error: ValidationError) -> str:
+    # One line per row error, e.g. "base_salary: Input should be a valid number".
+    return "; ".join(f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in error.errors())
@@ -1,16 +1,15 @@
+import csv
+import io
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
+from pydantic import ValidationError
 from models.models import Employee, User, Role
 from api.schemas import EmployeeCreate, RoleEnum
 from fastapi import HTTPException
-from passlib.context import CryptContext
+from core.auth import hash_password, hash_passwords
+from services.bulk_import import BULK_INSERT_CHUNK_SIZE, validation_message
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
-
 def create_employee_service(session: Session, emp: EmployeeCreate):
     try:
         # Enforce that employees must have a manager_id, managers must not
@@ -67,3 +66,114 @@ def create_employee_service(session: Session, emp: EmployeeCreate):
         session.rollback()
         print(f"Error creating employee: {e}")
         raise HTTPException(status_code=500, detail="Internal server error while creating employee.")
+
+
+def parse_employees_csv(content: bytes) -> list:
+    reader = csv.DictReader(io.StringIO(content.decode("utf-8-sig")))
+    return [{key: value for key, value in row.items() if value not in ("", None)} for row in reader]
+
+
+def _existing_values(session: Session, column, values: set) -> set:
+    if not values:
+        return set()
+    return {value for (value,) in session.query(column).filter(column.in_(values))}
+
+
+def _get_or_create_roles(session: Session, names: set) -> dict:
+    roles = {role.name: role.id for role in session.query(Role).filter(Role.name.in_(names))}
+    for name in names - roles.keys():
+        role = Role(name=name, description=f"{name.title()} role")
+        session.add(role)
+        session.flush()
+        roles[name] = role.id
+    return roles
+
+
+def create_employees_bulk_service(session: Session, rows: list):
+    errors = []
+    candidates = []
+    for index, row in enumerate(rows):
+        try:
+            emp = EmployeeCreate.model_validate(row)
+        except ValidationError as e:
+            errors.append({"row": index, "error": validation_message(e)})
+            continue
+        if emp.role == RoleEnum.employee and emp.manager_id is None:
+            errors.append({"row": index, "error": "manager_id is required for employees."})
+        elif emp.role == RoleEnum.manager and emp.manager_id is not None:
+            errors.append({"row": index, "error": "manager_id must not be set for managers."})
+        else:
+            candidates.append((index, emp))
+
+    # Check every uniqueness rule up front, against the database and within the batch,
+    # so the insert below doesn't fail halfway on a constraint violation.
+    taken = {
+        "username": _existing_values(session, User.username, {emp.username for _, emp in candidates}),
+        "email": _existing_values(session, User.email, {emp.email for _, emp in candidates})
+        | _existing_values(session, Employee.email, {emp.email for _, emp in candidates}),
+        "cnp": _existing_values(session, Employee.cnp, {emp.cnp for _, emp in candidates}),
+    }
+    known_managers = _existing_values(session, User.id, {emp.manager_id for _, emp in candidates if emp.manager_id is not None})
+
+    accepted = []
+    for index, emp in candidates:
+        duplicate = next((field for field in taken if getattr(emp, field) in taken[field]), None)
+        if duplicate:
+            errors.append({"row": index, "error": f"{duplicate} {getattr(emp, duplicate)} already exists"})
+            continue
+        if emp.manager_id is not None and emp.manager_id not in known_managers:
+            errors.append({"row": index, "error": f"Manager {emp.manager_id} not found"})
+            continue
+        for field in taken:
+            taken[field].add(getattr(emp, field))
+        accepted.append((index, emp))
+
+    password_hashes = hash_passwords([emp.password for _, emp in accepted])
+
+    created = []
+    try:
+        roles = _get_or_create_roles(session, {emp.role.value for _, emp in accepted}) if accepted else {}
+        for start in range(0, len(accepted), BULK_INSERT_CHUNK_SIZE):
+            chunk = accepted[start:start + BULK_INSERT_CHUNK_SIZE]
+            user_ids = session.scalars(
+                insert(User).returning(User.id, sort_by_parameter_order=True),
+                [
+                    {
+                        "username": emp.username,
+                        "email": emp.email,
+                        "password_hash": password_hash,
+                        "role_id": roles[emp.role.value],
+                    }
+                    for (_, emp), password_hash in zip(chunk, password_hashes[start:start + BULK_INSERT_CHUNK_SIZE])
+                ],
+            ).all()
+            session.execute(insert(Employee), [
+                {
+                    "employee_id": f"EMP{user_id}",
+                    "first_name": emp.first_name,
+                    "last_name": emp.last_name,
+                    "cnp": emp.cnp,
+                    "email": emp.email,
+                    "phone": emp.phone,
+                    "address": emp.address,
+                    "date_of_birth": emp.date_of_birth,
+                    "hire_date": emp.hire_date,
+                    "position": emp.position,
+                    "department": emp.department,
+                    "iban": emp.iban,
+                    "user_id": user_id,
+                    "manager_id": emp.manager_id,
+                }
+                for (_, emp), user_id in zip(chunk, user_ids)
+            ])
+            created.extend(
+                {"row": index, "username": emp.username, "employee_id": f"EMP{user_id}"}
+                for (index, emp), user_id in zip(chunk, user_ids)
+            )
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        print(f"Error bulk creating employees: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error while creating employees.")
+    errors.sort(key=lambda err: err["row"])
+    return {"inserted": len(created), "failed": len(errors), "employees": created, "errors": errors}
@@ -1,34 +1,75 @@
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.models import Employee, User, Role
-from typing import List
+from typing import Optional
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+EMPLOYEE_FIELDS = {column.name: column for column in Employee.__table__.columns}
 
-def get_all_managers_service(session: Session) -> List[Employee]:
+
+def employee_columns(fields: Optional[str] = None) -> list:
+    if not fields:
+        return list(EMPLOYEE_FIELDS.values())
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in EMPLOYEE_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    # id is the pagination key, so it is always returned.
+    if "id" not in names:
+        names.insert(0, "id")
+    return [EMPLOYEE_FIELDS[name] for name in names]
+
+
+async def paginate(session: AsyncSession, statement, key_column, limit: int, after: Optional[int] = None) -> dict:
+    # Keyset pagination: seek past the last seen key instead of OFFSET, so every
+    # page costs the same index range scan no matter how deep it is.
+    if after is not None:
+        statement = statement.where(key_column > after)
+    rows = (await session.execute(statement.order_by(key_column).limit(limit + 1))).all()
+    items = [row._asdict() for row in rows[:limit]]
+    next_cursor = items[-1]["id"] if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
+
+async def _employees_with_role(session: AsyncSession, role_name: str, limit: int, after: Optional[int], fields: Optional[str]) -> dict:
+    statement = (
+        select(*employee_columns(fields))
+        .join(User, Employee.user_id == User.id)
+        .join(Role, User.role_id == Role.id)
+        .where(Role.name == role_name)
+    )
+    return await paginate(session, statement, Employee.id, limit, after)
+
+
+async def get_all_managers_service(session: AsyncSession, limit: int = DEFAULT_PAGE_SIZE, after: Optional[int] = None, fields: Optional[str] = None) -> dict:
     try:
-        managers = (
-            session.query(Employee)
-            .join(User, Employee.user_id == User.id)
-            .join(Role, User.role_id == Role.id)
-            .filter(Role.name == 'manager')
-            .all()
-        )
-        return managers
+        return await _employees_with_role(session, 'manager', limit, after, fields)
+    except HTTPException as e:
+        raise e
     except Exception as e:
         print(f"Error retrieving managers: {e}")
         raise HTTPException(status_code=500, detail="Internal server error while retrieving managers.")
 
 
-def get_all_employees_service(session: Session) -> List[Employee]:
+async def get_all_employees_service(session: AsyncSession, limit: int = DEFAULT_PAGE_SIZE, after: Optional[int] = None, fields: Optional[str] = None) -> dict:
     try:
-        employees = (
-            session.query(Employee)
-            .join(User, Employee.user_id == User.id)
-            .join(Role, User.role_id == Role.id)
-            .filter(Role.name == 'employee')
-            .all()
-        )
-        return employees
+        return await _employees_with_role(session, 'employee', limit, after, fields)
+    except HTTPException as e:
+        raise e
     except Exception as e:
         print(f"Error retrieving employees: {e}")
         raise HTTPException(status_code=500, detail="Internal server error while retrieving employees.")
+
+
+async def get_all_users_service(session: AsyncSession, limit: int = DEFAULT_PAGE_SIZE, after: Optional[int] = None) -> dict:
+    try:
+        statement = (
+            select(User.id, User.username, User.email, Role.name.label("role"))
+            .outerjoin(Role, User.role_id == Role.id)
+        )
+        return await paginate(session, statement, User.id, limit, after)
+    except Exception as e:
+        print(f"Error retrieving users: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error while retrieving users.")
@@ -1,39 +1,72 @@
-import pandas as pd
-import io
+import time
+import xlsxwriter
 from sqlalchemy.orm import Session
-from models.models import Employee, SalarySlip
+from models.models import Employee, MonthlySalarySummary
 from datetime import date
 from fastapi import HTTPException
+from core.metrics import REPORT_BUILD_DURATION
+from core.storage import get_storage
 
-def generate_employee_salary_report(session: Session, employees=None) -> bytes:
+REPORT_COLUMNS = ["Employee name", "Salary to be paid", "Working days", "Vacation days", "Bonuses"]
+REPORT_FETCH_SIZE = 1000
+
+
+def write_employee_salary_report(session: Session, key: str, manager_id=None) -> int:
+    # Writes the report to archive storage under key and returns the number of rows.
+    start = time.perf_counter()
     try:
         today = date.today()
         month_start = today.replace(day=1)
-        if employees is None:
-            employees = session.query(Employee).all()
-        data = []
-        for emp in employees:
-            slip = (
-                session.query(SalarySlip)
-                .filter(SalarySlip.employee_id == emp.id)
-                .filter(SalarySlip.month >= month_start)
-                .order_by(SalarySlip.month.desc())
-                .first()
+        # Reads the pre-aggregated monthly summary: one indexed row per employee and month,
+        # however many historical slips exist. Like the slip query it replaced, it takes
+        # each employee's latest month from the current one on, so the rows come ordered
+        # by employee, newest month first, and only the first one per employee is written.
+        query = (
+            session.query(
+                MonthlySalarySummary.employee_id,
+                Employee.first_name,
+                Employee.last_name,
+                MonthlySalarySummary.total_salary,
+                MonthlySalarySummary.working_days,
+                MonthlySalarySummary.vacation_days,
+                MonthlySalarySummary.bonuses,
             )
-            if slip:
-                data.append({
-                    "Employee name": f"{emp.first_name} {emp.last_name}",
-                    "Salary to be paid": float(slip.total_salary),
-                    "Working days": slip.working_days,
-                    "Vacation days": slip.vacation_days,
-                    "Bonuses": float(slip.bonuses or 0),
-                })
-        df = pd.DataFrame(data)
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-            df.to_excel(writer, index=False, sheet_name='SalaryData')
-        output.seek(0)
-        return output.read()
+            .select_from(MonthlySalarySummary)
+            .join(Employee, Employee.id == MonthlySalarySummary.employee_id)
+            .filter(MonthlySalarySummary.month >= month_start)
+            .order_by(MonthlySalarySummary.employee_id, MonthlySalarySummary.month.desc())
+        )
+        if manager_id is not None:
+            # The summary's own manager_id follows reassignments (see models.models), so this
+            # is served by its manager/month index.
+            query = query.filter(MonthlySalarySummary.manager_id == manager_id)
+
+        # constant_memory flushes each row to disk once the next one starts, and yield_per
+        # streams from a server-side cursor, so memory stays flat regardless of row count.
+        # The storage backend publishes the finished file atomically (or uploads it in parts).
+        with get_storage().staged_path(key) as tmp_path:
+            workbook = xlsxwriter.Workbook(tmp_path, {"constant_memory": True})
+            try:
+                worksheet = workbook.add_worksheet("SalaryData")
+                worksheet.write_row(0, 0, REPORT_COLUMNS, workbook.add_format({"bold": True, "border": 1}))
+                row_count = 0
+                last_employee_id = None
+                for row in query.yield_per(REPORT_FETCH_SIZE):
+                    if row.employee_id == last_employee_id:
+                        continue
+                    last_employee_id = row.employee_id
+                    row_count += 1
+                    worksheet.write_row(row_count, 0, [
+                        f"{row.first_name} {row.last_name}",
+                        float(row.total_salary),
+                        row.working_days,
+                        row.vacation_days,
+                        float(row.bonuses or 0),
+                    ])
+            finally:
+                workbook.close()
+        REPORT_BUILD_DURATION.observe(time.perf_counter() - start)
+        return row_count
     except Exception as e:
         print(f"Error generating salary report: {e}")
         raise HTTPException(status_code=500, detail="Internal server error while generating salary report.")
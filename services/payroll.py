@@ -0,0 +1,109 @@
+import os
+import numpy as np
+from datetime import date
+from typing import NamedTuple
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from models.models import SalarySlip
+from services.salary_summary import refresh_monthly_summary
+from fastapi import HTTPException
+
+PAYROLL_STANDARD_WORKING_DAYS = float(os.getenv("PAYROLL_STANDARD_WORKING_DAYS", 21))
+PAYROLL_VACATION_PAY_RATE = float(os.getenv("PAYROLL_VACATION_PAY_RATE", 1.0))
+PAYROLL_BONUS_RATE = float(os.getenv("PAYROLL_BONUS_RATE", 1.0))
+PAYROLL_UPDATE_CHUNK_SIZE = 5000
+
+
+class PayrollRules(NamedTuple):
+    # base_salary is the pay for standard_working_days; each worked day earns
+    # base / standard days and each vacation day vacation_pay_rate of that.
+    standard_working_days: float = PAYROLL_STANDARD_WORKING_DAYS
+    vacation_pay_rate: float = PAYROLL_VACATION_PAY_RATE
+    bonus_rate: float = PAYROLL_BONUS_RATE
+
+
+DEFAULT_RULES = PayrollRules()
+
+
+def compute_totals(base_salary, working_days, vacation_days, bonuses, rules: PayrollRules = DEFAULT_RULES) -> np.ndarray:
+    # Operates on whole columns at once; scalars work too.
+    base_salary = np.asarray(base_salary, dtype=np.float64)
+    working_days = np.asarray(working_days, dtype=np.float64)
+    vacation_days = np.asarray(vacation_days, dtype=np.float64)
+    bonuses = np.nan_to_num(np.asarray(bonuses, dtype=np.float64))
+    daily_rate = base_salary / rules.standard_working_days
+    totals = daily_rate * (working_days + vacation_days * rules.vacation_pay_rate) + bonuses * rules.bonus_rate
+    # Round half up to cents; np.round would round halves to even.
+    return np.floor(totals * 100 + 0.5) / 100
+
+
+def compute_total(base_salary, working_days, vacation_days, bonuses, rules: PayrollRules = DEFAULT_RULES) -> float:
+    return float(compute_totals(base_salary, working_days, vacation_days, bonuses or 0, rules))
+
+
+def _month_bounds(month: date):
+    start = month.replace(day=1)
+    end = date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return start, end
+
+
+def run_payroll(session: Session, month: date, dry_run: bool = True, preview_limit: int = 100, rules: PayrollRules = DEFAULT_RULES) -> dict:
+    start, end = _month_bounds(month)
+    rows = (
+        session.query(
+            SalarySlip.id,
+            SalarySlip.employee_id,
+            SalarySlip.base_salary,
+            SalarySlip.working_days,
+            SalarySlip.vacation_days,
+            SalarySlip.bonuses,
+            SalarySlip.total_salary,
+        )
+        .filter(SalarySlip.month >= start, SalarySlip.month < end)
+        .order_by(SalarySlip.id)
+        .all()
+    )
+    if not rows:
+        raise HTTPException(status_code=404, detail=f"No salary slips found for {start:%Y-%m}.")
+
+    ids, employee_ids, base, working, vacation, bonuses, current = zip(*rows)
+    ids = np.asarray(ids, dtype=np.int64)
+    bonuses = [np.nan if value is None else value for value in bonuses]
+    totals = compute_totals(base, working, vacation, bonuses, rules)
+    current = np.asarray([np.nan if value is None else value for value in current], dtype=np.float64)
+    changed = np.flatnonzero(~np.isclose(totals, current, rtol=0, atol=0.005))
+
+    if not dry_run and changed.size:
+        try:
+            # Bulk UPDATE by primary key: executemany of one UPDATE per chunk, one transaction.
+            for chunk_start in range(0, changed.size, PAYROLL_UPDATE_CHUNK_SIZE):
+                chunk = changed[chunk_start:chunk_start + PAYROLL_UPDATE_CHUNK_SIZE]
+                session.execute(update(SalarySlip), [
+                    {"id": int(slip_id), "total_salary": float(total)}
+                    for slip_id, total in zip(ids[chunk], totals[chunk])
+                ])
+            refresh_monthly_summary(session, employee_ids={employee_ids[i] for i in changed}, months=[start])
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"Error persisting payroll for {start:%Y-%m}: {e}")
+            raise HTTPException(status_code=500, detail="Internal server error while persisting payroll.")
+
+    preview = [
+        {
+            "salary_slip_id": int(ids[i]),
+            "employee_id": employee_ids[i],
+            "current_total": None if np.isnan(current[i]) else float(current[i]),
+            "computed_total": float(totals[i]),
+        }
+        for i in changed[:preview_limit]
+    ]
+    return {
+        "month": start,
+        "dry_run": dry_run,
+        "slips": len(rows),
+        "changed": int(changed.size),
+        "total_payroll": round(float(totals.sum()), 2),
+        "rules": rules._asdict(),
+        "changes": preview,
+    }
@@ -0,0 +1,303 @@
+import json
+import os
+import queue
+import threading
+import traceback
+import uuid
+from datetime import date, datetime
+import redis
+from core.redis_client import redis_client
+from core.storage import archive_key, get_storage
+from db.session import SessionLocal
+from models.models import Employee
+from services.archive_manifest import SALARY_REPORT, SALARY_SLIP, record_artifacts
+from services.employee_report import write_employee_salary_report
+from services.pdf_batch import iter_rendered_pdfs
+from services.pdf_generator import load_salary_pdf_data_for_employees
+from services.reports_service import build_report_message, build_salary_slip_message, smtp_pool
+
+PAYROLL_QUEUE_SIZE = int(os.getenv("PAYROLL_QUEUE_SIZE", 64))
+PAYROLL_ARCHIVE_BATCH_SIZE = int(os.getenv("PAYROLL_ARCHIVE_BATCH_SIZE", 50))
+PAYROLL_RUN_TTL = int(os.getenv("PAYROLL_RUN_TTL", 40 * 86400))
+# A crashed run holds its lock until this expires; live runs keep extending it.
+PAYROLL_RUN_LOCK_TTL = int(os.getenv("PAYROLL_RUN_LOCK_TTL", 300))
+
+_DONE = object()
+
+
+def _run_key(manager_id: int, month: date) -> str:
+    return f"payroll_run:{manager_id}:{month:%Y-%m}"
+
+
+class _PayrollRun:
+    # One manager's monthly run: report, then render -> archive -> mail with the
+    # stages connected by bounded queues. Progress is checkpointed in Redis:
+    #   {key}           hash: status, report_path, report_sent, summary
+    #   {key}:archived  hash: Employee.id -> archive key of the PDF
+    #   {key}:mailed    set of Employee.id whose slip was sent
+
+    def __init__(self, db, manager_id, manager_email, progress=None):
+        self.db = db
+        self.manager_id = manager_id
+        self.manager_email = manager_email
+        self.progress = progress
+        self.today = date.today()
+        self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.storage = get_storage()
+        self.key = _run_key(manager_id, self.today)
+        self.lock_token = uuid.uuid4().hex
+        self.errors = []
+        self.counts = {"rendered": 0, "archived": 0, "mailed": 0}
+        self.finished = 0
+        self.total = 0
+        self.lock = threading.Lock()
+        self.archive_queue = queue.Queue(PAYROLL_QUEUE_SIZE)
+        self.mail_queue = queue.Queue(PAYROLL_QUEUE_SIZE)
+
+    def _checkpoint(self, **fields):
+        pipe = redis_client.pipeline()
+        pipe.hset(self.key, mapping=fields)
+        pipe.expire(self.key, PAYROLL_RUN_TTL)
+        pipe.execute()
+
+    def _error(self, error):
+        with self.lock:
+            self.errors.append(error)
+
+    def _finish(self, count=None):
+        with self.lock:
+            if count:
+                self.counts[count] += 1
+            self.finished += 1
+            finished = self.finished
+        self._extend_lock()
+        if self.progress:
+            self.progress(finished, self.total)
+
+    def run(self, restart=False):
+        state = {k.decode(): v.decode() for k, v in redis_client.hgetall(self.key).items()}
+        if not restart and state.get("status") == "completed":
+            return json.loads(state["summary"])
+        if not redis_client.set(f"{self.key}:lock", self.lock_token, nx=True, ex=PAYROLL_RUN_LOCK_TTL):
+            raise RuntimeError(f"A payroll run for {self.today:%Y-%m} is already in progress.")
+        try:
+            # Only discarded under the lock, so a restart can't wipe a live run's mailed set.
+            if restart:
+                redis_client.delete(self.key, f"{self.key}:archived", f"{self.key}:mailed")
+                state = {}
+            self._checkpoint(status="running", started_at=datetime.utcnow().isoformat())
+            summary = self._run(state)
+            status = "partial" if summary["errors"] else "completed"
+            self._checkpoint(status=status, summary=json.dumps(summary), finished_at=datetime.utcnow().isoformat())
+            return summary
+        finally:
+            self._release_lock()
+
+    def _extend_lock(self):
+        self._on_own_lock(lambda pipe, lock_key: pipe.expire(lock_key, PAYROLL_RUN_LOCK_TTL))
+
+    def _release_lock(self):
+        self._on_own_lock(lambda pipe, lock_key: pipe.delete(lock_key))
+
+    def _on_own_lock(self, command):
+        # Runs command on the lock only while it still holds our token: a run that
+        # outlived the lock TTL must not extend or release a lock a second run has taken.
+        lock_key = f"{self.key}:lock"
+        with redis_client.pipeline() as pipe:
+            try:
+                pipe.watch(lock_key)
+                if pipe.get(lock_key) != self.lock_token.encode():
+                    return
+                pipe.multi()
+                command(pipe, lock_key)
+                pipe.execute()
+            except redis.WatchError:
+                pass
+
+    def _run(self, state):
+        # Employees and their slip data are loaded once and handed down the pipeline.
+        employees = self.db.query(Employee).filter(Employee.manager_id == self.manager_id).all()
+        if not employees:
+            return {"month": f"{self.today:%Y-%m}", "employees": 0, "errors": ["No employees found for this manager."]}
+        report = self._report_stage(state)
+
+        pdf_data = load_salary_pdf_data_for_employees(self.db, employees)
+        for emp in employees:
+            if emp.id not in pdf_data:
+                self.errors.append({"employee": emp.email, "error": "Salary slip not found for this month"})
+        archived = {int(k): v.decode() for k, v in redis_client.hgetall(f"{self.key}:archived").items()}
+        mailed = {int(emp_id) for emp_id in redis_client.smembers(f"{self.key}:mailed")}
+        pending = [emp_id for emp_id in pdf_data if emp_id not in mailed]
+        self.total = len(pending)
+
+        mail_workers = max(1, min(smtp_pool.max_connections, len(pending)))
+        threads = [threading.Thread(target=self._archive_stage, args=(mail_workers,), name="payroll-archive")]
+        threads += [threading.Thread(target=self._mail_stage, name=f"payroll-mail-{i}") for i in range(mail_workers)]
+        for thread in threads:
+            thread.start()
+        try:
+            # Slips archived by an earlier attempt skip rendering and go straight to mailing.
+            for emp_id in pending:
+                if emp_id in archived:
+                    self.archive_queue.put((emp_id, pdf_data[emp_id], None, archived[emp_id]))
+            self._render_stage([emp_id for emp_id in pending if emp_id not in archived], pdf_data)
+        finally:
+            self.archive_queue.put(_DONE)
+            for thread in threads:
+                thread.join()
+
+        return {
+            "month": f"{self.today:%Y-%m}",
+            "employees": len(employees),
+            **self.counts,
+            "already_mailed": len(mailed),
+            "report": report,
+            "errors": self.errors,
+        }
+
+    def _report_stage(self, state):
+        if state.get("report_sent"):
+            return {"file": state["report_path"], "sent": True}
+        path = state.get("report_path")
+        try:
+            if not path or not self.storage.exists(path):
+                path = archive_key(self.manager_id, f"salary_report_{self.manager_id}_{self.timestamp}.xlsx", self.today)
+                write_employee_salary_report(self.db, path, manager_id=self.manager_id)
+                record_artifacts(self.db, SALARY_REPORT, [{"path": path, "manager_id": self.manager_id}])
+                self.db.commit()
+                self._checkpoint(report_path=path)
+            excel_bytes = self.storage.get_bytes(path)
+            smtp_pool.send(build_report_message(self.manager_email, excel_bytes, os.path.basename(path)))
+            self._checkpoint(report_sent=1)
+            return {"file": path, "sent": True}
+        except Exception as e:
+            traceback.print_exc()
+            self.db.rollback()
+            self.errors.append({"manager": self.manager_email, "error": str(e)})
+            return {"file": path, "sent": False}
+
+    def _render_stage(self, emp_ids, pdf_data):
+        # A full archive queue blocks _rendered, and with it the generator, so no more
+        # than PAYROLL_QUEUE_SIZE renders are ever outstanding.
+        emp_by_code = {pdf_data[emp_id]["employee_id"]: emp_id for emp_id in emp_ids}
+        items = [pdf_data[emp_id] for emp_id in emp_ids]
+        for data, pdf_bytes, error in iter_rendered_pdfs(items, self.today, max_in_flight=PAYROLL_QUEUE_SIZE):
+            if error is not None:
+                self._render_failed(data, error)
+            else:
+                self._rendered(emp_by_code[data["employee_id"]], data, pdf_bytes)
+
+    def _render_failed(self, data, error):
+        self._error({"employee": data["email"], "error": str(error)})
+        self._finish()
+
+    def _rendered(self, emp_id, data, pdf_bytes):
+        with self.lock:
+            self.counts["rendered"] += 1
+        self.archive_queue.put((emp_id, data, pdf_bytes, None))
+
+    def _archive_stage(self, mail_workers):
+        db = None
+        batch = []
+        item = None
+        try:
+            db = SessionLocal()
+            while True:
+                item = self.archive_queue.get()
+                if item is _DONE:
+                    break
+                emp_id, data, pdf_bytes, path = item
+                if path is not None:
+                    self.mail_queue.put(item)
+                    item = None
+                    continue
+                path = archive_key(self.manager_id, f"salary_slip_{data['employee_id']}_{self.timestamp}.pdf", self.today)
+                try:
+                    self.storage.put_bytes(path, pdf_bytes)
+                except Exception as e:
+                    traceback.print_exc()
+                    self._error({"employee": data["email"], "error": str(e)})
+                    self._finish()
+                    item = None
+                    continue
+                batch.append((emp_id, data, pdf_bytes, path))
+                item = None
+                if len(batch) >= PAYROLL_ARCHIVE_BATCH_SIZE or self.archive_queue.empty():
+                    self._flush_archive(db, batch)
+                    batch = []
+            self._flush_archive(db, batch)
+        except Exception as e:
+            # Anything unexpected (no DB session, a bad archive key...) fails the slips held
+            # here and every one still queued, but the queue is drained to the end so the
+            # render stage never blocks on a full archive_queue.
+            traceback.print_exc()
+            held = batch + ([item] if item is not None and item is not _DONE else [])
+            for _, data, _, _ in held:
+                self._archive_failed(data, e)
+            while item is not _DONE:
+                item = self.archive_queue.get()
+                if item is not _DONE:
+                    self._archive_failed(item[1], e)
+        finally:
+            if db is not None:
+                db.close()
+            for _ in range(mail_workers):
+                self.mail_queue.put(_DONE)
+
+    def _archive_failed(self, data, error):
+        self._error({"employee": data["email"], "error": f"Archiving failed: {error}"})
+        self._finish()
+
+    def _flush_archive(self, db, batch):
+        # Manifest rows and the checkpoint are written before anything in the batch is
+        # mailed, so a resumed run never re-renders a slip it already sent.
+        if not batch:
+            return
+        try:
+            record_artifacts(db, SALARY_SLIP, [
+                {"path": path, "manager_id": self.manager_id, "employee_id": emp_id}
+                for emp_id, _, _, path in batch
+            ])
+            db.commit()
+            pipe = redis_client.pipeline()
+            pipe.hset(f"{self.key}:archived", mapping={emp_id: path for emp_id, _, _, path in batch})
+            pipe.expire(f"{self.key}:archived", PAYROLL_RUN_TTL)
+            pipe.execute()
+        except Exception as e:
+            traceback.print_exc()
+            db.rollback()
+            for _, data, _, _ in batch:
+                self._archive_failed(data, e)
+            return
+        with self.lock:
+            self.counts["archived"] += len(batch)
+        for item in batch:
+            self.mail_queue.put(item)
+
+    def _mail_stage(self):
+        while True:
+            item = self.mail_queue.get()
+            if item is _DONE:
+                return
+            emp_id, data, pdf_bytes, path = item
+            try:
+                if pdf_bytes is None:
+                    pdf_bytes = self.storage.get_bytes(path)
+                smtp_pool.send(build_salary_slip_message(data["email"], data["first_name"], data["employee_id"], pdf_bytes))
+                pipe = redis_client.pipeline()
+                pipe.sadd(f"{self.key}:mailed", emp_id)
+                pipe.expire(f"{self.key}:mailed", PAYROLL_RUN_TTL)
+                pipe.execute()
+            except Exception as e:
+                print(f"Error sending email to {data['email']}: {e}")
+                self._error({"employee": data["email"], "error": str(e)})
+                self._finish()
+                continue
+            self._finish("mailed")
+
+
+def run_monthly_payroll(db, manager_id, manager_email, restart=False, progress=None):
+    # Builds and mails the manager report, then renders, archives and mails every
+    # employee's slip for the current month. Re-running resumes from the Redis
+    # checkpoints; restart=True discards them and starts over.
+    return _PayrollRun(db, manager_id, manager_email, progress=progress).run(restart=restart)
@@ -0,0 +1,168 @@
+import multiprocessing
+import os
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date
+from services.pdf_cache import get_or_render_pdf
+from core.metrics import PDFS_RENDERED
+from core.storage import get_storage
+
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", os.cpu_count() or 1))
+
+_executor = None
+
+
+def get_pdf_executor() -> ProcessPoolExecutor:
+    # One long-lived pool per process, so worker start-up is paid once rather than on
+    # every batch request. Workers are started by a forkserver, not forked from the
+    # API process: fork copies only the calling thread, so a lock another thread held
+    # at that moment (e.g. the PDF cache's size lock) would stay locked in the child.
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=PDF_WORKERS,
+            mp_context=multiprocessing.get_context("forkserver"),
+        )
+    return _executor
+
+
+def _reset_pdf_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
+
+
+def render_pdf_to_storage(data: dict, key: str, today: date):
+    # Returns (duration_ms, error message or None, cache hit). Failures are caught here,
+    # in the worker, so the parent gets the timing of failed renders too.
+    start = time.perf_counter()
+    cached = False
+    try:
+        pdf_bytes, _, cached = get_or_render_pdf(data, today)
+        get_storage().put_bytes(key, pdf_bytes)
+        error = None
+    except Exception as e:
+        traceback.print_exc()
+        error = str(e)
+    return round((time.perf_counter() - start) * 1000, 2), error, cached
+
+
+def _job_result(data, key, duration, error):
+    if error is None:
+        return {"employee": data["email"], "file": key, "duration_ms": duration}
+    return {"employee": data["email"], "error": error, "duration_ms": duration}
+
+
+def render_pdf_bytes(data: dict, today: date):
+    # Returns (pdf_bytes, cache hit).
+    pdf_bytes, _, cached = get_or_render_pdf(data, today)
+    return pdf_bytes, cached
+
+
+def render_pdfs_to_storage(jobs, today: date = None, progress=None):
+    # jobs: list of (data, archive key) pairs, data as built by load_salary_pdf_data_for_employees.
+    # Returns (generated, errors) with per-employee render timings. progress(done, total)
+    # is called as each slip finishes.
+    today = today or date.today()
+    generated = []
+    errors = []
+    cached = [0]
+    if not jobs:
+        return generated, errors
+
+    def _collect(data, key, duration, error, hit=False):
+        (generated if error is None else errors).append(_job_result(data, key, duration, error))
+        cached[0] += bool(hit and error is None)
+        if progress:
+            progress(len(generated) + len(errors), len(jobs))
+
+    if PDF_WORKERS <= 1 or len(jobs) == 1:
+        for data, key in jobs:
+            _collect(data, key, *render_pdf_to_storage(data, key, today))
+        _count_rendered(len(generated), len(errors), cached[0])
+        return generated, errors
+
+    executor = get_pdf_executor()
+    futures = {}
+    for data, key in jobs:
+        futures[executor.submit(render_pdf_to_storage, data, key, today)] = (data, key, time.perf_counter())
+    for future in as_completed(futures):
+        data, key, submitted = futures[future]
+        hit = False
+        try:
+            duration, error, hit = future.result()
+        except Exception as e:
+            # The job never reported back (e.g. the worker died), so only the time since
+            # submission is known.
+            duration = round((time.perf_counter() - submitted) * 1000, 2)
+            error = f"PDF worker crashed: {e}" if isinstance(e, BrokenProcessPool) else str(e)
+        _collect(data, key, duration, error, hit)
+    if any(isinstance(f.exception(), BrokenProcessPool) for f in futures):
+        _reset_pdf_executor()
+    _count_rendered(len(generated), len(errors), cached[0])
+    return generated, errors
+
+
+def _count_rendered(succeeded, failed, cached=0):
+    # Counted here in the parent: increments made inside pool workers would be lost.
+    # "ok" is an actual render, "cached" a slip served from the PDF cache.
+    PDFS_RENDERED.inc("ok", amount=succeeded - cached)
+    PDFS_RENDERED.inc("cached", amount=cached)
+    PDFS_RENDERED.inc("failed", amount=failed)
+
+
+def iter_rendered_pdfs(items, today: date = None, max_in_flight: int = None):
+    # Yields (data, pdf_bytes, error) for each slip data dict as renders finish, keeping
+    # at most max_in_flight renders outstanding so memory stays bounded for any team size.
+    # Each yielded slip is counted in PDFS_RENDERED.
+    today = today or date.today()
+    if PDF_WORKERS <= 1:
+        for data in items:
+            try:
+                pdf_bytes, cached = render_pdf_bytes(data, today)
+            except Exception as e:
+                _count_rendered(0, 1)
+                yield data, None, e
+                continue
+            _count_rendered(1, 0, cached)
+            yield data, pdf_bytes, None
+        return
+
+    executor = get_pdf_executor()
+    max_in_flight = max_in_flight or PDF_WORKERS * 2
+    pending = iter(items)
+    in_flight = {}
+    broken = False
+    try:
+        while True:
+            for data in pending:
+                in_flight[executor.submit(render_pdf_bytes, data, today)] = data
+                if len(in_flight) >= max_in_flight:
+                    break
+            if not in_flight:
+                return
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                data = in_flight.pop(future)
+                try:
+                    pdf_bytes, cached = future.result()
+                except BrokenProcessPool as e:
+                    broken = True
+                    _count_rendered(0, 1)
+                    yield data, None, RuntimeError(f"PDF worker crashed: {e}")
+                    continue
+                except Exception as e:
+                    _count_rendered(0, 1)
+                    yield data, None, e
+                    continue
+                _count_rendered(1, 0, cached)
+                yield data, pdf_bytes, None
+    finally:
+        # Reached early when the consumer stops iterating, e.g. a client disconnect.
+        for future in in_flight:
+            future.cancel()
+        if broken:
+            _reset_pdf_executor()
@@ -0,0 +1,101 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import date
+from services.pdf_generator import TEMPLATE_VERSION, render_salary_pdf
+
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", os.path.join(os.getcwd(), "cache", "pdf"))
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+_size_lock = threading.Lock()
+_approx_size = None
+
+
+def pdf_cache_key(data: dict, today: date = None) -> str:
+    # Everything that ends up in the rendered bytes: slip and employee fields, the
+    # render date printed in the footer, and the layout version.
+    today = today or date.today()
+    payload = json.dumps(
+        {"template": TEMPLATE_VERSION, "date": today.isoformat(), "data": data},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _cache_path(key: str) -> str:
+    return os.path.join(PDF_CACHE_DIR, key[:2], f"{key}.pdf")
+
+
+def _cache_files():
+    for root, _, files in os.walk(PDF_CACHE_DIR):
+        for name in files:
+            if name.endswith(".pdf"):
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+
+
+def _evict():
+    # Least recently used first: hits touch the file's mtime.
+    global _approx_size
+    files = sorted(_cache_files(), key=lambda item: item[2])
+    total = sum(size for _, size, _ in files)
+    target = PDF_CACHE_MAX_BYTES * 0.9
+    for path, size, _ in files:
+        if total <= target:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except FileNotFoundError:
+            pass
+    _approx_size = total
+
+
+def get_cached_pdf(key: str):
+    path = _cache_path(key)
+    try:
+        with open(path, "rb") as f:
+            pdf_bytes = f.read()
+    except FileNotFoundError:
+        return None
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return pdf_bytes
+
+
+def store_pdf(key: str, pdf_bytes: bytes):
+    global _approx_size
+    path = _cache_path(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(pdf_bytes)
+    os.replace(tmp_path, path)
+    with _size_lock:
+        if _approx_size is None:
+            _approx_size = sum(size for _, size, _ in _cache_files())
+        else:
+            _approx_size += len(pdf_bytes)
+        if _approx_size > PDF_CACHE_MAX_BYTES:
+            _evict()
+
+
+def get_or_render_pdf(data: dict, today: date = None, key: str = None):
+    # Returns (pdf_bytes, key, cached); the key doubles as the HTTP ETag and cached
+    # tells a cache hit from an actual render.
+    today = today or date.today()
+    key = key or pdf_cache_key(data, today)
+    pdf_bytes = get_cached_pdf(key)
+    if pdf_bytes is not None:
+        return pdf_bytes, key, True
+    pdf_bytes = render_salary_pdf(data, today)
+    store_pdf(key, pdf_bytes)
+    return pdf_bytes, key, False
@@ -1,152 +1,211 @@
 from fastapi import HTTPException
 from io import BytesIO
 from reportlab.lib.pagesizes import A4
+from reportlab.lib.pdfencrypt import StandardEncryption
 from reportlab.pdfgen import canvas
-from PyPDF2 import PdfReader, PdfWriter
 from models.models import Employee, SalarySlip
 from sqlalchemy.orm import Session
 from datetime import date
 
 
+def salary_pdf_data(employee: Employee, slip: SalarySlip) -> dict:
+    # Plain, picklable snapshot of everything the renderer needs, so rendering
+    # can run without a DB session (e.g. in a worker process).
+    return {
+        "first_name": employee.first_name,
+        "last_name": employee.last_name,
+        "employee_id": employee.employee_id,
+        "cnp": employee.cnp,
+        "email": employee.email,
+        "month": slip.month,
+        "working_days": slip.working_days,
+        "vacation_days": slip.vacation_days,
+        "bonuses": slip.bonuses or 0,
+        "base_salary": slip.base_salary,
+        "total_salary": slip.total_salary,
+    }
+
+
+def load_salary_pdf_data(session: Session, employee_id: int) -> dict:
+    employee = session.query(Employee).filter(Employee.id == employee_id).first()
+    if not employee:
+        raise ValueError("Employee not found")
+    month_start = date.today().replace(day=1)
+    slip = (
+        session.query(SalarySlip)
+        .filter(SalarySlip.employee_id == employee_id)
+        .filter(SalarySlip.month >= month_start)
+        .order_by(SalarySlip.month.desc())
+        .first()
+    )
+    if not slip:
+        raise ValueError("Salary slip not found for this month")
+    return salary_pdf_data(employee, slip)
+
+
+def load_salary_pdf_data_for_employees(session: Session, employees) -> dict:
+    # Current-month slip data for many employees in a single query,
+    # keyed by Employee.id. Employees without a slip are left out.
+    month_start = date.today().replace(day=1)
+    by_id = {emp.id: emp for emp in employees}
+    if not by_id:
+        return {}
+    slips = (
+        session.query(SalarySlip)
+        .filter(SalarySlip.employee_id.in_(list(by_id)))
+        .filter(SalarySlip.month >= month_start)
+        .order_by(SalarySlip.employee_id, SalarySlip.month.desc())
+        .all()
+    )
+    data = {}
+    for slip in slips:
+        if slip.employee_id not in data:
+            data[slip.employee_id] = salary_pdf_data(by_id[slip.employee_id], slip)
+    return data
+
+
+# Bump whenever the slip layout changes so cached PDFs are not served for the old one.
+TEMPLATE_VERSION = "1"
+
+WIDTH, HEIGHT = A4
+
+# RC4 128-bit, the same scheme the slips used when they were encrypted with PyPDF2.
+PDF_ENCRYPTION_STRENGTH = 128
+
+# Salary details table geometry, shared by the static frame and the per-employee values.
+ROW_HEIGHT = 20
+NUM_ROWS = 4
+BOX_X = 45
+BOX_WIDTH = WIDTH - 90
+BOX_HEIGHT = ROW_HEIGHT * NUM_ROWS + 10
+BOX_Y = HEIGHT - 205 - BOX_HEIGHT + 10
+COL_X = BOX_X + int(BOX_WIDTH / 2)
+
+
+def _row_y(row: int) -> float:
+    return BOX_Y + BOX_HEIGHT - row * ROW_HEIGHT + 5
+
+
+def _draw_static_layout(c: canvas.Canvas):
+    width, height = WIDTH, HEIGHT
+
+    # Header
+    c.setFont("Helvetica-Bold", 18)
+    c.drawCentredString(width / 2, height - 60, "DavaX Company")
+    c.setFont("Helvetica", 10)
+    c.drawCentredString(width / 2, height - 80, "Salary Slip")
+    # Logo box with vector drawing (stylized checkmark)
+    logo_x = 40
+    logo_y = height - 90
+    logo_w = 50
+    logo_h = 40
+    c.rect(logo_x, logo_y, logo_w, logo_h, stroke=1, fill=0)
+    # Draw a simple checkmark inside the box
+    c.setStrokeColorRGB(0.2, 0.5, 0.2)
+    c.setLineWidth(3)
+    c.line(logo_x + 10, logo_y + 15, logo_x + 22, logo_y + 5)
+    c.line(logo_x + 22, logo_y + 5, logo_x + 40, logo_y + 30)
+    c.setStrokeColorRGB(0, 0, 0)
+    c.setLineWidth(1)
+
+    # Employee Info Section
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(40, height - 120, "Employee Information")
+
+    # Salary Details Section (aligned, realistic)
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(40, height - 185, "Salary Details")
+    c.setFont("Helvetica", 10)
+    c.roundRect(BOX_X, BOX_Y, BOX_WIDTH, BOX_HEIGHT, 8, stroke=1, fill=0)
+
+    # Draw horizontal lines for rows
+    for i in range(1, NUM_ROWS):
+        c.line(BOX_X, BOX_Y + BOX_HEIGHT - i * ROW_HEIGHT, BOX_X + BOX_WIDTH, BOX_Y + BOX_HEIGHT - i * ROW_HEIGHT)
+
+    # Draw vertical line for columns
+    c.line(COL_X, BOX_Y, COL_X, BOX_Y + BOX_HEIGHT)
+
+    # Left column labels
+    c.drawString(BOX_X + 12, _row_y(1), "Month:")
+    c.drawString(BOX_X + 12, _row_y(2), "Working Days:")
+    c.drawString(BOX_X + 12, _row_y(3), "Vacation Days:")
+    c.drawString(BOX_X + 12, _row_y(4), "Additional Bonuses:")
+
+    # Right column labels
+    c.drawString(COL_X + 12, _row_y(1), "Base Salary:")
+    c.drawString(COL_X + 12, _row_y(2), "Net Salary:")
+
+    # Footer: Signature
+    c.setFont("Helvetica", 10)
+    c.drawString(width - 180, 100, "Signature:")
+    # Draw a stylized, cursive-like 'DavaX' as a signature
+    # Move signature slightly to the right for better alignment
+    sig_x = width - 125
+    sig_y = 90
+    c.setStrokeColorRGB(0.07, 0.13, 0.22)
+    c.setLineWidth(2.1)
+    # D
+    c.bezier(sig_x, sig_y, sig_x, sig_y + 18, sig_x + 18, sig_y + 18, sig_x + 18, sig_y)
+    c.bezier(sig_x, sig_y, sig_x + 9, sig_y - 10, sig_x + 18, sig_y + 8, sig_x + 18, sig_y)
+    # a
+    c.bezier(sig_x + 22, sig_y, sig_x + 22, sig_y + 10, sig_x + 32, sig_y + 10, sig_x + 32, sig_y)
+    c.bezier(sig_x + 22, sig_y, sig_x + 27, sig_y - 8, sig_x + 32, sig_y + 8, sig_x + 32, sig_y)
+    # v
+    c.bezier(sig_x + 36, sig_y + 8, sig_x + 40, sig_y - 8, sig_x + 44, sig_y + 8, sig_x + 48, sig_y)
+    # a
+    c.bezier(sig_x + 52, sig_y, sig_x + 52, sig_y + 10, sig_x + 62, sig_y + 10, sig_x + 62, sig_y)
+    c.bezier(sig_x + 52, sig_y, sig_x + 57, sig_y - 8, sig_x + 62, sig_y + 8, sig_x + 62, sig_y)
+    # X (crossed lines)
+    c.line(sig_x + 68, sig_y + 10, sig_x + 80, sig_y - 8)
+    c.line(sig_x + 68, sig_y - 8, sig_x + 80, sig_y + 10)
+    # Add a flourish under the signature
+    c.setLineWidth(1.1)
+    c.bezier(sig_x, sig_y - 6, sig_x + 30, sig_y - 18, sig_x + 60, sig_y - 2, sig_x + 85, sig_y - 10)
+    c.setStrokeColorRGB(0, 0, 0)
+    c.setLineWidth(1)
+
+    # Confidential note
+    c.setFont("Helvetica-Oblique", 8)
+    c.drawCentredString(width / 2, 60, "This document is confidential and intended for the recipient only.")
+
+
+def render_salary_pdf(data: dict, today: date = None) -> bytes:
+    today = today or date.today()
+    buffer = BytesIO()
+    # Password-protect the PDF with the CNP while it is written, instead of re-parsing it afterwards.
+    encryption = StandardEncryption(data["cnp"], strength=PDF_ENCRYPTION_STRENGTH)
+    c = canvas.Canvas(buffer, pagesize=A4, encrypt=encryption)
+    _draw_static_layout(c)
+
+    # Employee info values
+    c.setFont("Helvetica", 10)
+    c.drawString(50, HEIGHT - 140, f"Name: {data['first_name']} {data['last_name']}")
+    c.drawString(250, HEIGHT - 140, f"Employee ID: {data['employee_id']}")
+    c.drawString(50, HEIGHT - 155, f"CNP: {data['cnp']}")
+    c.drawString(250, HEIGHT - 155, f"Email: {data['email']}")
+
+    # Left column values
+    c.drawRightString(COL_X - 12, _row_y(1), data["month"].strftime('%B %Y'))
+    c.drawRightString(COL_X - 12, _row_y(2), str(data["working_days"]))
+    c.drawRightString(COL_X - 12, _row_y(3), str(data["vacation_days"]))
+    c.drawRightString(COL_X - 12, _row_y(4), f"{data['bonuses']:.2f}")
+
+    # Right column values
+    c.drawRightString(BOX_X + BOX_WIDTH - 12, _row_y(1), f"{data['base_salary']:.2f}")
+    c.setFont("Helvetica-Bold", 10)
+    c.drawRightString(BOX_X + BOX_WIDTH - 12, _row_y(2), f"{data['total_salary']:.2f}")
+    c.setFont("Helvetica", 10)
+
+    # Footer: Date
+    c.drawString(45, 100, f"Date: {today.strftime('%d %B %Y')}")
+
+    c.save()
+    return buffer.getvalue()
+
+
 def generate_salary_pdf(session: Session, employee_id: int) -> bytes:
     try:
-        employee = session.query(Employee).filter(Employee.id == employee_id).first()
-        if not employee:
-            raise ValueError("Employee not found")
-        today = date.today()
-        month_start = today.replace(day=1)
-        slip = (
-            session.query(SalarySlip)
-            .filter(SalarySlip.employee_id == employee_id)
-            .filter(SalarySlip.month >= month_start)
-            .order_by(SalarySlip.month.desc())
-            .first()
-        )
-        if not slip:
-            raise ValueError("Salary slip not found for this month")
-
-        buffer = BytesIO()
-        c = canvas.Canvas(buffer, pagesize=A4)
-        width, height = A4
-
-        # Header
-        c.setFont("Helvetica-Bold", 18)
-        c.drawCentredString(width / 2, height - 60, "DavaX Company")
-        c.setFont("Helvetica", 10)
-        c.drawCentredString(width / 2, height - 80, "Salary Slip")
-        # Logo box with vector drawing (stylized checkmark)
-        logo_x = 40
-        logo_y = height - 90
-        logo_w = 50
-        logo_h = 40
-        c.rect(logo_x, logo_y, logo_w, logo_h, stroke=1, fill=0)
-        # Draw a simple checkmark inside the box
-        c.setStrokeColorRGB(0.2, 0.5, 0.2)
-        c.setLineWidth(3)
-        c.line(logo_x + 10, logo_y + 15, logo_x + 22, logo_y + 5)
-        c.line(logo_x + 22, logo_y + 5, logo_x + 40, logo_y + 30)
-        c.setStrokeColorRGB(0, 0, 0)
-        c.setLineWidth(1)
-
-        # Employee Info Section
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(40, height - 120, "Employee Information")
-        c.setFont("Helvetica", 10)
-        c.drawString(50, height - 140, f"Name: {employee.first_name} {employee.last_name}")
-        c.drawString(250, height - 140, f"Employee ID: {employee.employee_id}")
-        c.drawString(50, height - 155, f"CNP: {employee.cnp}")
-        c.drawString(250, height - 155, f"Email: {employee.email}")
-
-        # Salary Details Section (aligned, realistic)
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(40, height - 185, "Salary Details")
-        c.setFont("Helvetica", 10)
-        # Adjusted box and text positions for proper framing
-        row_height = 20
-        num_rows = 4
-        box_x = 45
-        box_width = width - 90
-        box_height = row_height * num_rows + 10
-        box_y = height - 205 - box_height + 10
-        c.roundRect(box_x, box_y, box_width, box_height, 8, stroke=1, fill=0)
-
-        # Draw horizontal lines for rows
-        for i in range(1, num_rows):
-            c.line(box_x, box_y + box_height - i * row_height, box_x + box_width, box_y + box_height - i * row_height)
-
-        # Draw vertical line for columns
-        col_x = box_x + int(box_width / 2)
-        c.line(col_x, box_y, col_x, box_y + box_height)
-
-        # Left column labels and values
-        c.drawString(box_x + 12, box_y + box_height - row_height + 5, "Month:")
-        c.drawString(box_x + 12, box_y + box_height - 2 * row_height + 5, "Working Days:")
-        c.drawString(box_x + 12, box_y + box_height - 3 * row_height + 5, "Vacation Days:")
-        c.drawString(box_x + 12, box_y + box_height - 4 * row_height + 5, "Additional Bonuses:")
-
-        # Right column labels and values
-        c.drawString(col_x + 12, box_y + box_height - row_height + 5, "Base Salary:")
-        c.drawString(col_x + 12, box_y + box_height - 2 * row_height + 5, "Net Salary:")
-
-        # Left column values
-        c.drawRightString(col_x - 12, box_y + box_height - row_height + 5, slip.month.strftime('%B %Y'))
-        c.drawRightString(col_x - 12, box_y + box_height - 2 * row_height + 5, str(slip.working_days))
-        c.drawRightString(col_x - 12, box_y + box_height - 3 * row_height + 5, str(slip.vacation_days))
-        c.drawRightString(col_x - 12, box_y + box_height - 4 * row_height + 5, f"{slip.bonuses:.2f}")
-
-        # Right column values
-        c.drawRightString(box_x + box_width - 12, box_y + box_height - row_height + 5, f"{slip.base_salary:.2f}")
-        c.setFont("Helvetica-Bold", 10)
-        c.drawRightString(box_x + box_width - 12, box_y + box_height - 2 * row_height + 5, f"{slip.total_salary:.2f}")
-        c.setFont("Helvetica", 10)
-
-        # Footer: Date and Signature
-        c.setFont("Helvetica", 10)
-        c.drawString(45, 100, f"Date: {today.strftime('%d %B %Y')}")
-        c.drawString(width - 180, 100, "Signature:")
-        # Draw a stylized, cursive-like 'DavaX' as a signature
-        # Move signature slightly to the right for better alignment
-        sig_x = width - 125
-        sig_y = 90
-        c.setStrokeColorRGB(0.07, 0.13, 0.22)
-        c.setLineWidth(2.1)
-        # D
-        c.bezier(sig_x, sig_y, sig_x, sig_y + 18, sig_x + 18, sig_y + 18, sig_x + 18, sig_y)
-        c.bezier(sig_x, sig_y, sig_x + 9, sig_y - 10, sig_x + 18, sig_y + 8, sig_x + 18, sig_y)
-        # a
-        c.bezier(sig_x + 22, sig_y, sig_x + 22, sig_y + 10, sig_x + 32, sig_y + 10, sig_x + 32, sig_y)
-        c.bezier(sig_x + 22, sig_y, sig_x + 27, sig_y - 8, sig_x + 32, sig_y + 8, sig_x + 32, sig_y)
-        # v
-        c.bezier(sig_x + 36, sig_y + 8, sig_x + 40, sig_y - 8, sig_x + 44, sig_y + 8, sig_x + 48, sig_y)
-        # a
-        c.bezier(sig_x + 52, sig_y, sig_x + 52, sig_y + 10, sig_x + 62, sig_y + 10, sig_x + 62, sig_y)
-        c.bezier(sig_x + 52, sig_y, sig_x + 57, sig_y - 8, sig_x + 62, sig_y + 8, sig_x + 62, sig_y)
-        # X (crossed lines)
-        c.line(sig_x + 68, sig_y + 10, sig_x + 80, sig_y - 8)
-        c.line(sig_x + 68, sig_y - 8, sig_x + 80, sig_y + 10)
-        # Add a flourish under the signature
-        c.setLineWidth(1.1)
-        c.bezier(sig_x, sig_y - 6, sig_x + 30, sig_y - 18, sig_x + 60, sig_y - 2, sig_x + 85, sig_y - 10)
-        c.setStrokeColorRGB(0, 0, 0)
-        c.setLineWidth(1)
-
-        # Confidential note
-        c.setFont("Helvetica-Oblique", 8)
-        c.drawCentredString(width / 2, 60, "This document is confidential and intended for the recipient only.")
-
-        c.save()
-        buffer.seek(0)
-
-        # Password-protect PDF with CNP
-        reader = PdfReader(buffer)
-        writer = PdfWriter()
-        for page in reader.pages:
-            writer.add_page(page)
-        writer.encrypt(employee.cnp)
-        output = BytesIO()
-        writer.write(output)
-        output.seek(0)
-        return output.read()
+        return render_salary_pdf(load_salary_pdf_data(session, employee_id))
     except Exception as e:
         print(f"Error generating PDF for employee ID {employee_id}: {e}")
         raise HTTPException(status_code=500, detail="Internal server error while generating PDF.")
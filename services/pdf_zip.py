@@ -0,0 +1,46 @@
+import io
+import os
+import zipfile
+from datetime import date
+from services.pdf_batch import iter_rendered_pdfs
+
+# Encrypted PDFs barely compress, so a cheap level keeps the stream CPU-light.
+PDF_ZIP_COMPRESSLEVEL = int(os.getenv("PDF_ZIP_COMPRESSLEVEL", 1))
+
+
+class _ZipBuffer(io.RawIOBase):
+    # Write-only, unseekable sink: ZipFile then streams entries with data descriptors,
+    # and whatever it has written so far is handed out by drain().
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_salary_slips_zip(items, errors=None, today: date = None):
+    # Generator of ZIP bytes: each slip is rendered, compressed and yielded as soon as
+    # it is ready. Failures (and any passed-in errors) are listed in errors.txt at the end.
+    errors = list(errors or [])
+    buffer = _ZipBuffer()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=PDF_ZIP_COMPRESSLEVEL) as archive:
+        for data, pdf_bytes, error in iter_rendered_pdfs(items, today):
+            if error is not None:
+                errors.append(f"{data['email']}: {error}")
+                continue
+            archive.writestr(f"salary_slip_{data['employee_id']}.pdf", pdf_bytes)
+            yield buffer.drain()
+        if errors:
+            archive.writestr("errors.txt", "\n".join(errors) + "\n")
+    yield buffer.drain()
@@ -0,0 +1,34 @@
+from core.jobs import job_handler
+from services.reports_service import create_manager_report, create_pdfs_for_employees, send_report_to_manager, send_pdfs_to_employees
+from services.payroll_run import run_monthly_payroll
+
+
+@job_handler("createAggregatedEmployeeData")
+def create_manager_report_job(db, progress, manager_id):
+    progress(0, 1)
+    result = create_manager_report(db, manager_id)
+    progress(1, 1)
+    return result
+
+
+@job_handler("createPdfForEmployees")
+def create_pdfs_for_employees_job(db, progress, manager_id):
+    return create_pdfs_for_employees(db, manager_id, progress=progress)
+
+
+@job_handler("sendAggregatedEmployeeData")
+def send_report_to_manager_job(db, progress, manager_id, manager_email):
+    progress(0, 1)
+    result = send_report_to_manager(db, manager_id, manager_email)
+    progress(1, 1)
+    return result
+
+
+@job_handler("sendPdfToEmployees")
+def send_pdfs_to_employees_job(db, progress, manager_id):
+    return send_pdfs_to_employees(db, manager_id, progress=progress)
+
+
+@job_handler("runMonthlyPayroll")
+def run_monthly_payroll_job(db, progress, manager_id, manager_email, restart=False):
+    return run_monthly_payroll(db, manager_id, manager_email, restart=restart, progress=progress)
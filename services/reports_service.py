@@ -1,10 +1,20 @@
 import os
-import smtplib
 import traceback
 from datetime import datetime
+from functools import partial
 from models.models import Employee
-from services.employee_report import generate_employee_salary_report
-from services.pdf_generator import generate_salary_pdf
+from services.employee_report import write_employee_salary_report
+from services.pdf_generator import load_salary_pdf_data_for_employees
+from services.pdf_batch import render_pdfs_to_storage
+from services.smtp_pool import SMTPConnectionPool
+from services.archive_manifest import (
+    SALARY_REPORT,
+    SALARY_SLIP,
+    latest_artifact,
+    latest_artifacts_for_employees,
+    record_artifacts,
+)
+from core.storage import archive_key, get_storage
 from email.message import EmailMessage
 from fastapi import HTTPException
 
@@ -13,84 +23,95 @@ smtp_port = int(os.getenv("SMTP_PORT", 587))
 smtp_user = os.getenv("SMTP_USER", "user@example.com")
 smtp_password = os.getenv("SMTP_PASSWORD", "password")
 sender_email = os.getenv("SENDER_EMAIL", smtp_user)
+smtp_starttls = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
+smtp_pool_size = int(os.getenv("SMTP_POOL_SIZE", 4))
+
+smtp_pool = SMTPConnectionPool(
+    smtp_server,
+    smtp_port,
+    user=smtp_user,
+    password=smtp_password,
+    starttls=smtp_starttls,
+    max_connections=smtp_pool_size,
+)
+
+def build_report_message(manager_email, excel_bytes, filename):
+    msg = EmailMessage()
+    msg["Subject"] = "Aggregated Employee Salary Report"
+    msg["From"] = sender_email
+    msg["To"] = manager_email
+    msg.set_content("Dear Manager,\n\nPlease find attached the aggregated employee salary report for this month.\n\nBest regards,\nHR Department")
+    msg.add_attachment(excel_bytes, maintype="application", subtype="vnd.openxmlformats-officedocument.spreadsheetml.sheet", filename=filename)
+    return msg
+
+
+def build_salary_slip_message(email, first_name, employee_id, pdf_bytes):
+    msg = EmailMessage()
+    msg["Subject"] = "Your Salary Slip"
+    msg["From"] = sender_email
+    msg["To"] = email
+    msg.set_content(f"Dear {first_name},\n\nPlease find attached your salary slip for this month.\n\nBest regards,\nHR Department")
+    msg.add_attachment(pdf_bytes, maintype="application", subtype="pdf", filename=f"salary_slip_{employee_id}.pdf")
+    return msg
+
 
 def create_manager_report(db, manager_id):
-    archive_dir = os.path.join(os.getcwd(), "archive")
-    os.makedirs(archive_dir, exist_ok=True)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
-    employees = db.query(Employee).filter(Employee.manager_id == manager_id).all()
-    if not employees:
+    has_employees = db.query(Employee.id).filter(Employee.manager_id == manager_id).first()
+    if not has_employees:
         return {"sent": 0, "errors": ["No employees found for this manager."]}
 
-    excel_bytes = generate_employee_salary_report(db, employees=employees)
-    archive_path = os.path.join(archive_dir, f"salary_report_{timestamp}.xlsx")
-    with open(archive_path, "wb") as f:
-        f.write(excel_bytes)
+    report_key = archive_key(manager_id, f"salary_report_{manager_id}_{timestamp}.xlsx")
+    write_employee_salary_report(db, report_key, manager_id=manager_id)
+    record_artifacts(db, SALARY_REPORT, [{"path": report_key, "manager_id": manager_id}])
+    db.commit()
 
     return {"sent": 1, "errors": []}
 
 
 
-def create_pdfs_for_employees(db, manager_id):
-    archive_dir = os.path.join(os.getcwd(), "archive")
-    os.makedirs(archive_dir, exist_ok=True)
+def create_pdfs_for_employees(db, manager_id, progress=None):
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
     employees = db.query(Employee).filter(Employee.manager_id == manager_id).all()
     if not employees:
         return {"generated": False, "error": f"No employees found for manager_id {manager_id}", "manager_id": manager_id}
 
-    generated = []
-    errors = []
-    for emp in employees:
-        try:
-            pdf_bytes = generate_salary_pdf(db, emp.id)
-            archive_path = os.path.join(archive_dir, f"salary_slip_{emp.employee_id}_{timestamp}.pdf")
-            with open(archive_path, "wb") as f:
-                f.write(pdf_bytes)
-            generated.append({"employee": emp.email, "file": archive_path})
-        except ValueError as e:
-            errors.append({"employee": emp.email, "error": str(e)})
-        except Exception as e:
-            traceback.print_exc()
-            errors.append({"employee": emp.email, "error": str(e)})
+    pdf_data = load_salary_pdf_data_for_employees(db, employees)
+    errors = [
+        {"employee": emp.email, "error": "Salary slip not found for this month", "duration_ms": 0.0}
+        for emp in employees if emp.id not in pdf_data
+    ]
+    keys = {
+        emp.id: archive_key(manager_id, f"salary_slip_{emp.employee_id}_{timestamp}.pdf")
+        for emp in employees if emp.id in pdf_data
+    }
+    jobs = [(pdf_data[emp_id], key) for emp_id, key in keys.items()]
+    generated, render_errors = render_pdfs_to_storage(jobs, progress=progress)
+    errors.extend(render_errors)
+
+    employee_by_key = {key: emp_id for emp_id, key in keys.items()}
+    record_artifacts(db, SALARY_SLIP, [
+        {"path": item["file"], "manager_id": manager_id, "employee_id": employee_by_key[item["file"]]}
+        for item in generated
+    ])
+    db.commit()
     return {"generated": generated, "errors": errors}
 
 
-def get_latest_report_file(archive_dir, prefix, extension):
-    os.makedirs(archive_dir, exist_ok=True)
-    files = [f for f in os.listdir(archive_dir) if f.startswith(prefix) and f.endswith(extension)]
-    if not files:
-        return None
-    latest_file = max(files, key=lambda x: x[len(prefix):-len(extension)])
-    return os.path.join(archive_dir, latest_file)
-
-def send_report_to_manager(manager_email):
-    archive_dir = os.path.join(os.getcwd(), "archive")
-    prefix = "salary_report_"
-    extension = ".xlsx"
-    excel_path = get_latest_report_file(archive_dir, prefix, extension)
-    if not excel_path:
+def send_report_to_manager(db, manager_id, manager_email):
+    excel_key = latest_artifact(db, SALARY_REPORT, manager_id=manager_id)
+    if not excel_key:
         return {"sent": 0, "errors": ["No archived Excel report found."]}
 
 
     errors = []
     try:
-        with open(excel_path, "rb") as f:
-            excel_bytes = f.read()
-
-        msg = EmailMessage()
-        msg["Subject"] = "Aggregated Employee Salary Report"
-        msg["From"] = sender_email
-        msg["To"] = manager_email
-        msg.set_content("Dear Manager,\n\nPlease find attached the aggregated employee salary report for this month.\n\nBest regards,\nHR Department")
-        msg.add_attachment(excel_bytes, maintype="application", subtype="vnd.openxmlformats-officedocument.spreadsheetml.sheet", filename=os.path.basename(excel_path))
-
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
-            server.starttls()
-            server.login(smtp_user, smtp_password)
-            server.send_message(msg)
+        excel_bytes = get_storage().get_bytes(excel_key)
+        msg = build_report_message(manager_email, excel_bytes, os.path.basename(excel_key))
+
+        smtp_pool.send(msg)
         return {"sent": 1, "errors": []}
     except Exception as e:
         traceback.print_exc()
@@ -98,45 +119,35 @@ def send_report_to_manager(manager_email):
         return {"sent": 0, "errors": errors}
     
 
-def send_pdfs_to_employees(db, manager_id):
+def send_pdfs_to_employees(db, manager_id, progress=None):
     employees = db.query(Employee).filter(Employee.manager_id == manager_id).all()
     if not employees:
         raise HTTPException(status_code=404, detail="No employees found for this manager.")
 
 
-    sent_count = 0
     errors = []
-    archive_dir = os.path.join(os.getcwd(), "archive")
-
+    latest_pdfs = latest_artifacts_for_employees(db, SALARY_SLIP, [emp.id for emp in employees])
 
+    recipients = []
     for emp in employees:
-        prefix = f"salary_slip_{emp.employee_id}_"
-        pdf_files = [f for f in os.listdir(archive_dir) if f.startswith(prefix) and f.endswith(".pdf")]
-        if not pdf_files:
+        pdf_key = latest_pdfs.get(emp.id)
+        if not pdf_key:
             errors.append({"employee": emp.email, "error": "No archived PDF found for this employee."})
             continue
-        latest_pdf = max(pdf_files, key=lambda x: x[len(prefix):-4])  
-        pdf_path = os.path.join(archive_dir, latest_pdf)
-        
-        try:
-            with open(pdf_path, "rb") as f:
-                pdf_bytes = f.read()
-
-            msg = EmailMessage()
-            msg["Subject"] = "Your Salary Slip"
-            msg["From"] = sender_email
-            msg["To"] = emp.email
-            msg.set_content(f"Dear {emp.first_name},\n\nPlease find attached your salary slip for this month.\n\nBest regards,\nHR Department")
-            msg.add_attachment(pdf_bytes, maintype="application", subtype="pdf", filename=f"salary_slip_{emp.employee_id}.pdf")
-
-            with smtplib.SMTP(smtp_server, smtp_port) as server:
-                server.starttls()
-                server.login(smtp_user, smtp_password)
-                server.send_message(msg)
+        recipients.append((emp, pdf_key))
+
+    def _load_message(emp, pdf_key):
+        pdf_bytes = get_storage().get_bytes(pdf_key)
+        return build_salary_slip_message(emp.email, emp.first_name, emp.employee_id, pdf_bytes)
+
+    # Each PDF is only read once a send slot is free, so memory stays flat for any team size.
+    messages = (partial(_load_message, emp, pdf_key) for emp, pdf_key in recipients)
+    sent_count = 0
+    results = smtp_pool.send_many(messages, progress=progress, total=len(recipients))
+    for (emp, _), error in zip(recipients, results):
+        if error is None:
             sent_count += 1
-        except Exception as e:
-            print(f"Error sending email to {emp.email}: {e}")
-            traceback.print_exc()
-            errors.append({"employee": emp.email, "error": str(e)})
-            continue
+        else:
+            print(f"Error sending email to {emp.email}: {error}")
+            errors.append({"employee": emp.email, "error": str(error)})
     return {"sent": sent_count, "total": len(employees), "errors": errors}
@@ -1,6 +1,14 @@
+import csv
+import io
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from models.models import SalarySlip
+from pydantic import ValidationError
+from models.models import Employee, SalarySlip
 from api.salary_schemas import SalarySlipCreate
+from services.payroll import compute_total, compute_totals
+from services.bulk_import import BULK_INSERT_CHUNK_SIZE, validation_message
+from services.salary_summary import refresh_monthly_summary
 from fastapi import HTTPException
 
 
@@ -13,9 +21,13 @@ def create_salary_slip_service(session: Session, slip: SalarySlipCreate):
             working_days=slip.working_days,
             vacation_days=slip.vacation_days,
             bonuses=slip.bonuses,
-            total_salary=slip.total_salary
+            total_salary=slip.total_salary if slip.total_salary is not None else compute_total(
+                slip.base_salary, slip.working_days, slip.vacation_days, slip.bonuses
+            )
         )
         session.add(salary_slip)
+        session.flush()
+        refresh_monthly_summary(session, employee_ids=[salary_slip.employee_id], months=[salary_slip.month])
         session.commit()
         session.refresh(salary_slip)
         return {"message": "Salary slip created successfully", "salary_slip_id": salary_slip.id}
@@ -24,8 +36,76 @@ def create_salary_slip_service(session: Session, slip: SalarySlipCreate):
         raise HTTPException(status_code=500, detail="Internal server error while creating salary slip.")
 
 
-def get_salary_slips_for_employee(db: Session, employee_id: int):
-    slips = db.query(SalarySlip).filter(SalarySlip.employee_id == employee_id).order_by(SalarySlip.month.desc()).all()
+def parse_salary_slips_csv(content: bytes) -> list:
+    reader = csv.DictReader(io.StringIO(content.decode("utf-8-sig")))
+    # Empty cells fall back to the schema defaults (e.g. bonuses) instead of failing validation.
+    return [{key: value for key, value in row.items() if value not in ("", None)} for row in reader]
+
+
+def create_salary_slips_bulk_service(session: Session, rows: list):
+    errors = []
+    slips = []
+    for index, row in enumerate(rows):
+        try:
+            slips.append((index, SalarySlipCreate.model_validate(row)))
+        except ValidationError as e:
+            errors.append({"row": index, "error": validation_message(e)})
+
+    employee_ids = {slip.employee_id for _, slip in slips}
+    known_ids = set()
+    if employee_ids:
+        known_ids = {emp_id for (emp_id,) in session.query(Employee.id).filter(Employee.id.in_(employee_ids))}
+
+    values = []
+    for index, slip in slips:
+        if slip.employee_id not in known_ids:
+            errors.append({"row": index, "error": f"Employee {slip.employee_id} not found"})
+            continue
+        values.append({
+            "employee_id": slip.employee_id,
+            "month": slip.month,
+            "base_salary": slip.base_salary,
+            "working_days": slip.working_days,
+            "vacation_days": slip.vacation_days,
+            "bonuses": slip.bonuses,
+            "total_salary": slip.total_salary,
+        })
+
+    missing = [value for value in values if value["total_salary"] is None]
+    if missing:
+        totals = compute_totals(
+            [value["base_salary"] for value in missing],
+            [value["working_days"] for value in missing],
+            [value["vacation_days"] for value in missing],
+            [value["bonuses"] or 0 for value in missing],
+        )
+        for value, total in zip(missing, totals.tolist()):
+            value["total_salary"] = total
+
+    try:
+        # executemany of a plain insert() is sent as batched multi-row INSERT ... VALUES statements,
+        # all inside one transaction.
+        for start in range(0, len(values), BULK_INSERT_CHUNK_SIZE):
+            session.execute(insert(SalarySlip), values[start:start + BULK_INSERT_CHUNK_SIZE])
+        if values:
+            refresh_monthly_summary(
+                session,
+                employee_ids={value["employee_id"] for value in values},
+                months={value["month"] for value in values},
+            )
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        print(f"Error bulk creating salary slips: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error while creating salary slips.")
+    errors.sort(key=lambda err: err["row"])
+    return {"inserted": len(values), "failed": len(errors), "errors": errors}
+
+
+async def get_salary_slips_for_employee(db: AsyncSession, employee_id: int):
+    slips = (await db.scalars(
+        select(SalarySlip).where(SalarySlip.employee_id == employee_id).order_by(SalarySlip.month.desc())
+    )).all()
     return [
         {
             "id": slip.id,
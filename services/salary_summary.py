@@ -0,0 +1,70 @@
+from datetime import date
+from sqlalchemy import Date, and_, cast, func, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from models.models import Employee, MonthlySalarySummary, SalarySlip
+
+SUMMARY_COLUMNS = [
+    "employee_id",
+    "month",
+    "manager_id",
+    "department",
+    "salary_slip_id",
+    "base_salary",
+    "working_days",
+    "vacation_days",
+    "bonuses",
+    "total_salary",
+    "updated_at",
+]
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _month_bounds(months):
+    bounds = []
+    for start in sorted({month_start(month) for month in months}):
+        end = date(start.year + start.month // 12, start.month % 12 + 1, 1)
+        bounds.append(and_(SalarySlip.month >= start, SalarySlip.month < end))
+    return or_(*bounds)
+
+
+def refresh_monthly_summary(session: Session, employee_ids=None, months=None):
+    # Recomputes the summary rows for the given employees and months (all of them when
+    # omitted) from salary_slip in one INSERT ... SELECT DISTINCT ON ... ON CONFLICT.
+    # Cost scales with the slips touched, not the table. Runs in the caller's transaction.
+    slip_month = cast(func.date_trunc("month", SalarySlip.month), Date)
+    latest_slips = (
+        select(
+            SalarySlip.employee_id,
+            slip_month,
+            Employee.manager_id,
+            Employee.department,
+            SalarySlip.id,
+            SalarySlip.base_salary,
+            SalarySlip.working_days,
+            SalarySlip.vacation_days,
+            SalarySlip.bonuses,
+            SalarySlip.total_salary,
+            func.now(),
+        )
+        .join(Employee, Employee.id == SalarySlip.employee_id)
+        .distinct(SalarySlip.employee_id, slip_month)
+        .order_by(SalarySlip.employee_id, slip_month, SalarySlip.month.desc(), SalarySlip.id.desc())
+    )
+    if employee_ids is not None:
+        employee_ids = list(employee_ids)
+        if not employee_ids:
+            return
+        latest_slips = latest_slips.where(SalarySlip.employee_id.in_(employee_ids))
+    if months:
+        latest_slips = latest_slips.where(_month_bounds(months))
+
+    statement = insert(MonthlySalarySummary).from_select(SUMMARY_COLUMNS, latest_slips)
+    statement = statement.on_conflict_do_update(
+        index_elements=[MonthlySalarySummary.employee_id, MonthlySalarySummary.month],
+        set_={column: statement.excluded[column] for column in SUMMARY_COLUMNS[2:]},
+    )
+    session.execute(statement)
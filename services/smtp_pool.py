@@ -0,0 +1,164 @@
+import queue
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from core.metrics import EMAILS_SENT
+
+
+class SMTPConnectionPool:
+    # Keeps up to max_connections authenticated SMTP sessions and hands them out
+    # to senders, so STARTTLS and login are paid once per connection instead of
+    # once per message. Sessions that the server dropped are replaced on demand.
+
+    def __init__(self, host, port, user=None, password=None, starttls=True, max_connections=4,
+                 timeout=30, idle_timeout=60, max_messages_per_connection=100):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.max_messages_per_connection = max_messages_per_connection
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_connections)
+
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                server.starttls()
+            if self.user:
+                server.login(self.user, self.password)
+        except Exception:
+            self._close(server)
+            raise
+        return {"server": server, "sent": 0, "last_used": time.monotonic()}
+
+    @staticmethod
+    def _close(server):
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    def _acquire(self, fresh=False):
+        self._slots.acquire()
+        try:
+            while not fresh:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._connect()
+                # Servers commonly drop sessions that sat idle; don't bother reusing those.
+                if time.monotonic() - conn["last_used"] < self.idle_timeout:
+                    return conn
+                self._close(conn["server"])
+            return self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, conn, reusable=True):
+        if reusable and conn["sent"] < self.max_messages_per_connection:
+            conn["last_used"] = time.monotonic()
+            self._idle.put(conn)
+        else:
+            self._close(conn["server"])
+        self._slots.release()
+
+    def send(self, msg, retries=1):
+        try:
+            self._send(msg, retries)
+        except Exception:
+            EMAILS_SENT.inc("failed")
+            raise
+        EMAILS_SENT.inc("sent")
+
+    def _send(self, msg, retries):
+        fresh = False
+        for attempt in range(retries + 1):
+            conn = self._acquire(fresh=fresh)
+            try:
+                conn["server"].send_message(msg)
+            except (smtplib.SMTPServerDisconnected, ConnectionError) as e:
+                self._release(conn, reusable=False)
+                if attempt == retries:
+                    raise e
+                # A dropped session usually means the server restarted and every idle
+                # session is dead too: discard them and retry on a new connection.
+                self.close()
+                fresh = True
+                continue
+            except smtplib.SMTPResponseException:
+                # The message was rejected but the session may still be fine; reset it for the next sender.
+                try:
+                    conn["server"].rset()
+                    self._release(conn)
+                except Exception:
+                    self._release(conn, reusable=False)
+                raise
+            except Exception:
+                self._release(conn, reusable=False)
+                raise
+            conn["sent"] += 1
+            self._release(conn)
+            return
+
+    def send_many(self, messages, progress=None, total=None):
+        # Sends messages over up to max_connections sessions at once. messages can be any
+        # iterable, and an entry can be a zero-arg callable building the message: entries
+        # are pulled one at a time as a session frees up, so at most max_connections
+        # messages are held in memory. Returns one entry per message, in order: None on
+        # success or the raised exception. progress(done, total) is called after each message.
+        if total is None and hasattr(messages, "__len__"):
+            total = len(messages)
+        pending = enumerate(messages)
+        results = {}
+        lock = threading.Lock()
+
+        def _worker():
+            while True:
+                with lock:
+                    try:
+                        index, msg = next(pending)
+                    except StopIteration:
+                        return
+                error = None
+                if callable(msg):
+                    try:
+                        msg = msg()
+                    except Exception as e:
+                        # send() never sees a message that could not be built, so count it here.
+                        EMAILS_SENT.inc("failed")
+                        error = e
+                if error is None:
+                    try:
+                        self.send(msg)
+                    except Exception as e:
+                        error = e
+                with lock:
+                    results[index] = error
+                    if progress:
+                        progress(len(results), total)
+
+        workers = self.max_connections if total is None else min(self.max_connections, total)
+        if workers < 1:
+            return []
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for future in [executor.submit(_worker) for _ in range(workers)]:
+                future.result()
+        return [results[index] for index in range(len(results))]
+
+    def close(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(conn["server"])
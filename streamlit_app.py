@@ -1,5 +1,6 @@
 import streamlit as st
 import requests
+import time
 import uuid
 import os
 from dotenv import load_dotenv
@@ -8,6 +9,8 @@ from dotenv import load_dotenv
 load_dotenv()
 
 API_URL = os.getenv("API_URL", "http://localhost:8000")
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 1))
+JOB_WAIT_TIMEOUT = float(os.getenv("JOB_WAIT_TIMEOUT", 900))
 
 
 if "idempotency_key" not in st.session_state:
@@ -32,6 +35,30 @@ def login():
             st.error("Login failed. Check your credentials.")
 
 
+def wait_for_job(job_id, headers):
+    # Poll the job status endpoint until the background job finishes and return its result.
+    progress_bar = st.progress(0.0, text="Queued...")
+    deadline = time.monotonic() + JOB_WAIT_TIMEOUT
+    while True:
+        response = requests.get(f"{API_URL}/jobs/{job_id}", headers={"Authorization": headers["Authorization"]})
+        response.raise_for_status()
+        job = response.json()
+        done = job["progress"]["done"]
+        total = job["progress"]["total"]
+        if job["status"] == "completed":
+            progress_bar.progress(1.0, text="Done")
+            return job["result"]
+        if job["status"] == "failed":
+            progress_bar.empty()
+            raise RuntimeError(job.get("error") or "Job failed")
+        if time.monotonic() >= deadline:
+            progress_bar.empty()
+            raise RuntimeError(f"Job {job_id} did not finish within {JOB_WAIT_TIMEOUT:.0f} seconds; check its status later.")
+        fraction = done / total if total else 0.0
+        progress_bar.progress(fraction, text=f"{job['status'].title()}... {done}/{total}" if total else f"{job['status'].title()}...")
+        time.sleep(JOB_POLL_INTERVAL)
+
+
 def logout():
     try:
         st.session_state.pop("token", None)
@@ -55,9 +82,9 @@ def generate_aggregated_report():
         "Idempotency-Key": st.session_state["agg_report_idempotency_key"]
     }
     response = requests.post(f"{API_URL}/createAggregatedEmployeeData", headers=headers)
-    if response.status_code == 200 and response.content:
+    if response.status_code == 202 and response.content:
         try:
-            result = response.json()
+            result = wait_for_job(response.json()["job_id"], headers)
             sent = result.get("sent", 0)
             errors = result.get("errors", [])
             if sent > 0 and not errors:
@@ -65,6 +92,8 @@ def generate_aggregated_report():
             else:
                 error_msg = errors if errors else result
                 st.error(f"No report generated: {error_msg}")
+        except RuntimeError as e:
+            st.error(f"No report generated: {e}")
         except Exception:
             st.error("Received invalid JSON from server.")
     else:
@@ -97,8 +126,8 @@ def generate_employee_report():
 
     try:
         response = requests.post(f"{API_URL}/createPdfForEmployees", headers=headers)
-        if response.status_code == 200:
-            result = response.json()
+        if response.status_code == 202:
+            result = wait_for_job(response.json()["job_id"], headers)
             generated = result.get("generated", [])
             errors = result.get("errors", [])
             if generated:
@@ -131,8 +160,8 @@ def send_salary_pdf():
     }
     try:
         response = requests.post(f"{API_URL}/sendPdfToEmployees", headers=headers)
-        if response.status_code == 200:
-            result = response.json()
+        if response.status_code == 202:
+            result = wait_for_job(response.json()["job_id"], headers)
             sent_count = result.get("sent", 0)
             total = result.get("total", 0)
             errors = result.get("errors", [])
@@ -166,9 +195,9 @@ def send_aggregated_employee_data():
     }
     try:
         response = requests.post(f"{API_URL}/sendAggregatedEmployeeData", headers=headers)
-        if response.status_code == 200 and response.content:
+        if response.status_code == 202 and response.content:
             try:
-                result = response.json()
+                result = wait_for_job(response.json()["job_id"], headers)
                 st.success("Aggregated employee data sent to manager successfully!")
                 sent = result.get("sent", 0)
                 errors = result.get("errors", [])
@@ -177,6 +206,8 @@ def send_aggregated_employee_data():
                 else:
                     error_msg = errors if errors else result
                     st.error(f"No reports sent: {error_msg}")
+            except RuntimeError as e:
+                st.error(f"No reports sent: {e}")
             except Exception:
                 st.error("Received invalid JSON from server.")
         else:
@@ -0,0 +1,121 @@
+import os
+import socket
+import sys
+import tempfile
+from datetime import date
+
+_tmp = tempfile.mkdtemp(prefix="slip-salary-tests-")
+os.environ.setdefault("LOG_FILE", os.path.join(_tmp, "app.log"))
+os.environ.setdefault("ARCHIVE_DIR", os.path.join(_tmp, "archive"))
+os.environ.setdefault("PDF_CACHE_DIR", os.path.join(_tmp, "cache"))
+os.environ.setdefault("PDF_WORKERS", "1")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+from aiosmtpd.controller import Controller  # noqa: E402
+from aiosmtpd.handlers import Sink  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+from models.models import Base, Employee, MonthlySalarySummary, SalarySlip, User  # noqa: E402
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def pg_db():
+    # PostgreSQL-only SQL (DISTINCT ON, ON CONFLICT) needs a real server: point
+    # TEST_DATABASE_URL at a throwaway database, e.g. the docker-compose one.
+    url = os.getenv("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+
+class _Recorder(Sink):
+    def __init__(self):
+        self.received = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received.append((envelope.rcpt_tos[0], envelope.content))
+        return "250 OK"
+
+
+class SMTPStandIn:
+    # A local aiosmtpd server recording every recipient; restart() drops all open sessions.
+
+    def __init__(self):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port = sock.getsockname()[1]
+        self.handler = _Recorder()
+        self.controller = None
+
+    @property
+    def recipients(self):
+        return [rcpt for rcpt, _ in self.handler.received]
+
+    def start(self):
+        self.controller = Controller(self.handler, hostname="127.0.0.1", port=self.port)
+        self.controller.start()
+
+    def stop(self):
+        self.controller.stop()
+
+    def restart(self):
+        self.stop()
+        self.start()
+
+
+@pytest.fixture
+def smtp_server():
+    server = SMTPStandIn()
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def seed_team(db):
+    return lambda size, manager_id=1: _seed_team(db, size, manager_id)
+
+
+def _seed_team(session, size, manager_id):
+    # A manager with `size` employees, each with a slip and summary row for the current month.
+    month = date.today().replace(day=1)
+    session.add(User(id=manager_id, username=f"manager{manager_id}", email=f"manager{manager_id}@example.com", password_hash="x"))
+    for i in range(1, size + 1):
+        session.add(Employee(
+            id=i, employee_id=f"E{i:04d}", first_name="First", last_name=f"Last{i}", cnp=f"1900101{i:06d}",
+            email=f"employee{i}@example.com", department=f"Dept{i % 3}", position="Engineer", manager_id=manager_id,
+        ))
+        session.add(SalarySlip(
+            id=i, employee_id=i, month=month, base_salary=4200, working_days=20, vacation_days=1, bonuses=100,
+            total_salary=4300,
+        ))
+        session.add(MonthlySalarySummary(
+            employee_id=i, month=month, manager_id=manager_id, department=f"Dept{i % 3}", salary_slip_id=i,
+            base_salary=4200, working_days=20, vacation_days=1, bonuses=100, total_salary=4300,
+        ))
+    session.commit()
@@ -0,0 +1,18 @@
+from core import auth
+from models.models import User
+
+
+def test_principal_is_evicted_on_commit_not_flush(db):
+    db.add(User(id=1, username="manager1", email="old@example.com", password_hash="x"))
+    db.commit()
+    auth._cache_principal("manager1", auth.load_principal(db, "manager1"))
+
+    db.get(User, 1).email = "new@example.com"
+    db.flush()
+    assert auth._cached_principal("manager1").email == "old@example.com"
+    db.rollback()
+    assert auth._cached_principal("manager1").email == "old@example.com"
+
+    db.get(User, 1).email = "new@example.com"
+    db.commit()
+    assert auth._cached_principal("manager1") is None
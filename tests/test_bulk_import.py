@@ -0,0 +1,119 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import pytest
+from api.routers import employee, salary_slip
+from core.auth import get_db, manager_required
+from models.models import Employee, MonthlySalarySummary, SalarySlip, User
+
+
+def _client(session):
+    app = FastAPI()
+    app.include_router(employee.router)
+    app.include_router(salary_slip.router)
+    app.dependency_overrides[get_db] = lambda: session
+    app.dependency_overrides[manager_required] = lambda: None
+    return TestClient(app)
+
+
+def _seed_employee(session):
+    session.add(User(id=1, username="manager1", email="manager1@example.com", password_hash="x"))
+    session.add(Employee(
+        id=1, employee_id="E0001", first_name="First", last_name="Last1", cnp="1900101000001",
+        email="employee1@example.com", department="Dept1", position="Engineer", manager_id=1,
+    ))
+    session.commit()
+
+
+def _slip(**overrides):
+    row = {"employee_id": 1, "month": "2026-03-01", "base_salary": 2100, "working_days": 21, "vacation_days": 0, "bonuses": 100}
+    row.update(overrides)
+    return row
+
+
+@pytest.fixture
+def slip_client(pg_db):
+    # Bulk slip inserts refresh the monthly summary, which is PostgreSQL-only SQL.
+    _seed_employee(pg_db)
+    return _client(pg_db)
+
+
+def test_create_salary_slips_reports_row_errors(slip_client, pg_db):
+    response = slip_client.post("/createSalarySlips", json=[
+        _slip(),
+        _slip(base_salary="lots"),
+        _slip(employee_id=99),
+        _slip(month="2026-03-15", total_salary=2500),
+    ])
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["inserted"], body["failed"]) == (2, 2)
+    assert [error["row"] for error in body["errors"]] == [1, 2]
+    assert body["errors"][0]["error"].startswith("base_salary:")
+    assert body["errors"][1]["error"] == "Employee 99 not found"
+    assert sorted(float(total) for (total,) in pg_db.query(SalarySlip.total_salary)) == [2200.0, 2500.0]
+    assert float(pg_db.query(MonthlySalarySummary.total_salary).scalar()) == 2500.0
+
+
+def test_upload_salary_slips_reports_row_errors(slip_client, pg_db):
+    csv_body = (
+        "employee_id,month,base_salary,working_days,vacation_days,bonuses\n"
+        "1,2026-03-01,2100,21,0,\n"
+        "1,2026-03-01,2100,,0,100\n"
+    )
+    response = slip_client.post("/uploadSalarySlips", files={"file": ("slips.csv", csv_body, "text/csv")})
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["inserted"], body["failed"]) == (1, 1)
+    assert body["errors"][0]["row"] == 1
+    assert body["errors"][0]["error"].startswith("working_days:")
+    assert float(pg_db.query(SalarySlip.total_salary).scalar()) == 2100.0
+
+
+def _employee(i, **overrides):
+    row = {
+        "username": f"user{i}", "password": "secret", "email": f"user{i}@example.com", "first_name": "First",
+        "last_name": f"Last{i}", "cnp": f"19001010{i:05d}", "date_of_birth": "1990-01-01",
+        "hire_date": "2024-01-01", "role": "employee", "manager_id": 1,
+    }
+    row.update(overrides)
+    return row
+
+
+def test_create_employees_reports_row_errors(db):
+    _seed_employee(db)
+    response = _client(db).post("/createEmployees", json=[
+        _employee(10),
+        _employee(11, email="not-an-email"),
+        _employee(12, manager_id=None),
+        _employee(13, username="user10"),
+        _employee(14, manager_id=99),
+        _employee(15, role="manager", manager_id=None),
+    ])
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["inserted"], body["failed"]) == (2, 4)
+    assert [employee["row"] for employee in body["employees"]] == [0, 5]
+    assert [(error["row"], error["error"]) for error in body["errors"][1:]] == [
+        (2, "manager_id is required for employees."),
+        (3, "username user10 already exists"),
+        (4, "Manager 99 not found"),
+    ]
+    assert body["errors"][0]["row"] == 1 and body["errors"][0]["error"].startswith("email:")
+    assert db.query(Employee).count() == 3
+
+
+def test_upload_employees_reports_row_errors(db):
+    _seed_employee(db)
+    header = "username,password,email,first_name,last_name,cnp,date_of_birth,hire_date,role,manager_id\n"
+    csv_body = header + (
+        "user20,secret,user20@example.com,First,Last20,1900101000020,1990-01-01,2024-01-01,employee,1\n"
+        "user21,secret,employee1@example.com,First,Last21,1900101000021,1990-01-01,2024-01-01,employee,1\n"
+        "user22,secret,user22@example.com,First,Last22,,1990-01-01,2024-01-01,employee,1\n"
+    )
+    response = _client(db).post("/uploadEmployees", files={"file": ("employees.csv", csv_body, "text/csv")})
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["inserted"], body["failed"]) == (1, 2)
+    assert body["employees"][0]["username"] == "user20"
+    assert body["errors"][0] == {"row": 1, "error": "email employee1@example.com already exists"}
+    assert body["errors"][1]["row"] == 2 and body["errors"][1]["error"].startswith("cnp:")
@@ -0,0 +1,18 @@
+from sqlalchemy import create_engine, text
+from db.session import InstrumentedQueuePool, pool_stats
+
+
+def _engine(max_overflow):
+    return create_engine("sqlite://", poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=max_overflow)
+
+
+def test_pool_stats_are_per_engine():
+    first, second = _engine(2), _engine(7)
+    with first.connect() as conn:
+        conn.execute(text("select 1"))
+    first.dispose()  # recreates the pool; its counters carry over
+    with first.connect() as conn:
+        conn.execute(text("select 1"))
+
+    assert (pool_stats(first)["checkouts"], pool_stats(first)["max_overflow"]) == (2, 2)
+    assert (pool_stats(second)["checkouts"], pool_stats(second)["max_overflow"]) == (0, 7)
@@ -0,0 +1,48 @@
+from datetime import date
+import pytest
+from sqlalchemy import event
+from core.storage import get_storage
+from models.models import Employee, MonthlySalarySummary, User
+from services.employee_report import write_employee_salary_report
+
+
+def _count_queries(session, fn):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return result, statements
+
+
+@pytest.mark.parametrize("headcount", [5, 200])
+def test_report_is_one_query_regardless_of_headcount(db, seed_team, headcount):
+    seed_team(headcount)
+    key = f"tests/report_{headcount}.xlsx"
+    rows, statements = _count_queries(db, lambda: write_employee_salary_report(db, key, manager_id=1))
+    assert rows == headcount
+    assert len(statements) == 1, statements
+    assert get_storage().get_bytes(key)[:2] == b"PK"
+
+
+def test_report_takes_each_employees_latest_month_for_their_current_manager(db, seed_team):
+    seed_team(3)
+    month = date.today().replace(day=1)
+    next_month = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+    db.add(MonthlySalarySummary(
+        employee_id=1, month=next_month, manager_id=1, department="Dept1", salary_slip_id=1,
+        base_salary=5000, working_days=20, vacation_days=0, bonuses=0, total_salary=5000,
+    ))
+    db.add(User(id=2, username="manager2", email="manager2@example.com", password_hash="x"))
+    db.commit()
+    db.get(Employee, 3).manager_id = 2
+    db.commit()
+
+    assert write_employee_salary_report(db, "tests/report_latest.xlsx", manager_id=1) == 2
+    assert write_employee_salary_report(db, "tests/report_moved.xlsx", manager_id=2) == 1
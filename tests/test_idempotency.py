@@ -0,0 +1,65 @@
+import threading
+import fakeredis
+import pytest
+from fastapi import HTTPException
+from core import idempotency
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    redis = fakeredis.FakeRedis()
+    monkeypatch.setattr(idempotency, "redis_client", redis)
+    return redis
+
+
+def test_concurrent_duplicate_waits_for_the_first_result(redis):
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append("first")
+        started.set()
+        release.wait(5)
+        return {"job_id": "abc"}
+
+    results = []
+    first = threading.Thread(target=lambda: results.append(idempotency.run_idempotent("scope", "k", slow)))
+    first.start()
+    started.wait(5)
+    duplicate = threading.Thread(
+        target=lambda: results.append(idempotency.run_idempotent("scope", "k", lambda: calls.append("second")))
+    )
+    duplicate.start()
+    release.set()
+    first.join()
+    duplicate.join()
+    assert results == [{"job_id": "abc"}, {"job_id": "abc"}]
+    assert calls == ["first"]
+
+
+def test_completed_key_replays_without_calling_fn(redis):
+    assert idempotency.run_idempotent("scope", "k", lambda: {"sent": 3}) == {"sent": 3}
+
+    def fail():
+        raise AssertionError("fn must not run again")
+
+    assert idempotency.run_idempotent("scope", "k", fail) == {"sent": 3}
+
+
+def test_failed_key_is_reclaimed_and_rerun(redis):
+    def boom():
+        raise HTTPException(status_code=503, detail="SMTP down")
+
+    with pytest.raises(HTTPException):
+        idempotency.run_idempotent("scope", "k", boom)
+    assert idempotency.run_idempotent("scope", "k", lambda: {"sent": 1}) == {"sent": 1}
+    assert idempotency.run_idempotent("scope", "k", boom) == {"sent": 1}
+
+
+def test_wait_times_out_while_still_in_progress(redis, monkeypatch):
+    monkeypatch.setattr(idempotency, "IDEMPOTENCY_WAIT_TIMEOUT", 0.2)
+    redis.set("idempotency:scope:k", idempotency._IN_PROGRESS)
+    with pytest.raises(HTTPException) as exc:
+        idempotency.run_idempotent("scope", "k", lambda: {"sent": 1})
+    assert exc.value.status_code == 409
@@ -0,0 +1,41 @@
+import fakeredis
+import pytest
+from core import jobs
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(jobs, "redis_client", client)
+    return client
+
+
+def test_dead_worker_jobs_are_requeued_or_failed(redis):
+    started = jobs.enqueue_job("sendPdfToEmployees", 1, manager_id=1)["job_id"]
+    waiting = jobs.enqueue_job("sendPdfToEmployees", 1, manager_id=1)["job_id"]
+    # A worker took both jobs, started the first and then died without a heartbeat.
+    processing = jobs._processing_key("dead")
+    redis.sadd(jobs.JOB_WORKERS_KEY, "dead")
+    redis.lmove(jobs.JOB_QUEUE_KEY, processing, "RIGHT", "LEFT")
+    redis.lmove(jobs.JOB_QUEUE_KEY, processing, "RIGHT", "LEFT")
+    jobs.update_job(started, status="running")
+
+    jobs.recover_jobs()
+
+    assert jobs.get_job(started)["status"] == "failed"
+    assert redis.lrange(jobs.JOB_QUEUE_KEY, 0, -1) == [waiting.encode()]
+    assert not redis.exists(processing)
+    assert not redis.smembers(jobs.JOB_WORKERS_KEY)
+
+
+def test_live_worker_jobs_are_left_alone(redis):
+    job_id = jobs.enqueue_job("sendPdfToEmployees", 1, manager_id=1)["job_id"]
+    redis.sadd(jobs.JOB_WORKERS_KEY, "alive")
+    jobs._beat("alive")
+    redis.lmove(jobs.JOB_QUEUE_KEY, jobs._processing_key("alive"), "RIGHT", "LEFT")
+    jobs.update_job(job_id, status="running")
+
+    jobs.recover_jobs()
+
+    assert jobs.get_job(job_id)["status"] == "running"
+    assert redis.lrange(jobs._processing_key("alive"), 0, -1) == [job_id.encode()]
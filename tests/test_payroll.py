@@ -0,0 +1,11 @@
+import numpy as np
+from services.payroll import compute_total, compute_totals
+
+
+def test_totals_round_half_up_to_cents():
+    # 2100 for a full month plus a 100.125 bonus lands exactly on half a cent,
+    # where np.round would round to the even 2200.12.
+    totals = compute_totals([2100, 0], [21, 0], [0, 0], [100.125, 0.125])
+    assert totals.tolist() == [2200.13, 0.13]
+    assert np.round(2200.125, 2) == 2200.12
+    assert compute_total(2100, 21, 0, 100.125) == 2200.13
@@ -0,0 +1,71 @@
+import threading
+import fakeredis
+import pytest
+from services import payroll_run
+from services.smtp_pool import SMTPConnectionPool
+
+
+@pytest.fixture
+def run_env(monkeypatch, session_factory, smtp_server):
+    redis = fakeredis.FakeRedis()
+    pool = SMTPConnectionPool("127.0.0.1", smtp_server.port, starttls=False, max_connections=2)
+    monkeypatch.setattr(payroll_run, "redis_client", redis)
+    monkeypatch.setattr(payroll_run, "SessionLocal", session_factory)
+    monkeypatch.setattr(payroll_run, "smtp_pool", pool)
+    yield redis
+    pool.close()
+
+
+def test_run_mails_every_slip_once(db, seed_team, run_env, smtp_server):
+    seed_team(5)
+    summary = payroll_run.run_monthly_payroll(db, 1, "manager1@example.com")
+    assert summary["errors"] == []
+    assert summary["rendered"] == summary["archived"] == summary["mailed"] == 5
+    assert summary["report"]["sent"]
+
+    # A completed run is not repeated.
+    assert payroll_run.run_monthly_payroll(db, 1, "manager1@example.com") == summary
+    assert sorted(smtp_server.recipients) == sorted(
+        ["manager1@example.com"] + [f"employee{i}@example.com" for i in range(1, 6)]
+    )
+
+
+def test_restart_during_live_run_keeps_its_checkpoints(db, seed_team, run_env):
+    seed_team(2)
+    key = payroll_run._run_key(1, payroll_run.date.today())
+    run_env.sadd(f"{key}:mailed", 1)
+    run_env.set(f"{key}:lock", 1)
+
+    with pytest.raises(RuntimeError):
+        payroll_run.run_monthly_payroll(db, 1, "manager1@example.com", restart=True)
+    assert run_env.smembers(f"{key}:mailed") == {b"1"}
+
+
+def test_run_does_not_touch_a_lock_it_no_longer_holds(db, run_env):
+    run = payroll_run._PayrollRun(db, 1, "manager1@example.com")
+    run_env.set(f"{run.key}:lock", "another-run", ex=60)
+    run._extend_lock()
+    run._release_lock()
+    assert run_env.get(f"{run.key}:lock") == b"another-run"
+    assert run_env.ttl(f"{run.key}:lock") <= 60
+
+    run_env.set(f"{run.key}:lock", run.lock_token)
+    run._release_lock()
+    assert run_env.get(f"{run.key}:lock") is None
+
+
+def test_archive_stage_failure_does_not_hang_the_run(db, seed_team, run_env, monkeypatch):
+    seed_team(3)
+    monkeypatch.setattr(payroll_run, "PAYROLL_QUEUE_SIZE", 1)
+
+    def no_session():
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(payroll_run, "SessionLocal", no_session)
+    summary = {}
+    thread = threading.Thread(target=lambda: summary.update(payroll_run.run_monthly_payroll(db, 1, "manager1@example.com")))
+    thread.start()
+    thread.join(timeout=30)
+    assert not thread.is_alive()
+    assert summary["mailed"] == 0
+    assert sorted(error["employee"] for error in summary["errors"]) == [f"employee{i}@example.com" for i in range(1, 4)]
@@ -0,0 +1,45 @@
+from datetime import date
+from decimal import Decimal
+import pytest
+from core.metrics import PDFS_RENDERED
+from services import pdf_batch
+
+
+def _slip(i, **overrides):
+    data = {
+        "first_name": "First", "last_name": f"Last{i}", "employee_id": f"E{i:04d}", "cnp": f"1900101{i:06d}",
+        "email": f"employee{i}@example.com", "month": date.today().replace(day=1), "working_days": 20,
+        "vacation_days": 1, "bonuses": Decimal("100.00"), "base_salary": Decimal("4200.00"),
+        "total_salary": Decimal("4300.00"),
+    }
+    data.update(overrides)
+    return data
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_every_entry_carries_its_duration(monkeypatch, workers):
+    monkeypatch.setattr(pdf_batch, "PDF_WORKERS", workers)
+    pdf_batch._reset_pdf_executor()
+    jobs = [(_slip(i), f"tests/batch_{workers}/slip_{i}.pdf") for i in range(3)]
+    jobs.append((_slip(3, base_salary="not a number"), f"tests/batch_{workers}/slip_3.pdf"))
+    try:
+        generated, errors = pdf_batch.render_pdfs_to_storage(jobs)
+    finally:
+        pdf_batch._reset_pdf_executor()
+
+    assert sorted(item["employee"] for item in generated) == [f"employee{i}@example.com" for i in range(3)]
+    assert [item["employee"] for item in errors] == ["employee3@example.com"]
+    assert all(item["duration_ms"] > 0 for item in generated + errors)
+
+
+def test_cache_hits_are_not_counted_as_renders(monkeypatch):
+    monkeypatch.setattr(pdf_batch, "PDF_WORKERS", 1)
+    jobs = [(_slip(100), "tests/cached/slip_100.pdf")]
+    pdf_batch.render_pdfs_to_storage(jobs)
+    before = dict(PDFS_RENDERED._values)
+
+    pdf_batch.render_pdfs_to_storage(jobs)
+    list(pdf_batch.iter_rendered_pdfs([_slip(100)]))
+    after = PDFS_RENDERED._values
+    assert after[("cached",)] - before.get(("cached",), 0) == 2
+    assert after[("ok",)] == before[("ok",)]
@@ -0,0 +1,39 @@
+from datetime import date
+from decimal import Decimal
+from io import BytesIO
+import pytest
+from PyPDF2 import PdfReader
+from services.pdf_generator import render_salary_pdf
+
+SLIP = {
+    "first_name": "Ana", "last_name": "Popescu", "employee_id": "E0042", "cnp": "2900101123456",
+    "email": "ana.popescu@example.com", "month": date(2026, 10, 1), "working_days": 20, "vacation_days": 1,
+    "bonuses": Decimal("150.00"), "base_salary": Decimal("4200.00"), "total_salary": Decimal("4350.00"),
+}
+
+
+@pytest.fixture(scope="module")
+def pdf_bytes():
+    return render_salary_pdf(SLIP, today=date(2026, 10, 18))
+
+
+def test_slip_is_encrypted(pdf_bytes):
+    assert b"/Encrypt" in pdf_bytes
+    # The slip values must not appear in clear text anywhere in the file.
+    assert SLIP["cnp"].encode() not in pdf_bytes
+    assert b"4350.00" not in pdf_bytes
+    assert PdfReader(BytesIO(pdf_bytes)).is_encrypted
+
+
+def test_wrong_password_is_rejected(pdf_bytes):
+    reader = PdfReader(BytesIO(pdf_bytes))
+    assert not reader.decrypt("1900101000000")
+
+
+def test_opens_with_cnp_and_contains_slip_values(pdf_bytes):
+    reader = PdfReader(BytesIO(pdf_bytes))
+    assert reader.decrypt(SLIP["cnp"])
+    text = reader.pages[0].extract_text()
+    for expected in ("Ana Popescu", "E0042", SLIP["cnp"], "ana.popescu@example.com", "October 2026",
+                     "4200.00", "4350.00", "150.00", "18 October 2026"):
+        assert expected in text
@@ -0,0 +1,48 @@
+import logging
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from core.logging import setup_request_logging
+from core.metrics import HTTP_REQUESTS, setup_metrics
+
+
+def _client():
+    app = FastAPI()
+    setup_request_logging(app)
+    setup_metrics(app)
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int, request: Request):
+        request.state.user_id = 42
+        return {"item_id": item_id, "request_id": request.state.request_id}
+
+    @app.get("/boom")
+    def boom():
+        raise RuntimeError("boom")
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def test_request_is_logged_and_counted_by_route(caplog):
+    client = _client()
+    before = HTTP_REQUESTS._values.get(("GET", "/items/{item_id}", 200), 0)
+    with caplog.at_level(logging.INFO, logger="app.requests"):
+        response = client.get("/items/7", headers={"X-Request-ID": "abc123"})
+
+    assert response.status_code == 200
+    assert response.headers["X-Request-ID"] == "abc123"
+    assert response.json() == {"item_id": 7, "request_id": "abc123"}
+    assert HTTP_REQUESTS._values[("GET", "/items/{item_id}", 200)] == before + 1
+    fields = [record.fields for record in caplog.records if record.name == "app.requests"][-1]
+    assert fields["request_id"] == "abc123"
+    assert fields["route"] == "/items/{item_id}"
+    assert fields["status"] == 200
+    assert fields["user_id"] == 42
+
+
+def test_unhandled_error_is_recorded_as_500(caplog):
+    client = _client()
+    before = HTTP_REQUESTS._values.get(("GET", "/boom", 500), 0)
+    with caplog.at_level(logging.INFO, logger="app.requests"):
+        assert client.get("/boom").status_code == 500
+    assert HTTP_REQUESTS._values[("GET", "/boom", 500)] == before + 1
+    assert [record.fields for record in caplog.records if record.name == "app.requests"][-1]["status"] == 500
@@ -0,0 +1,64 @@
+from datetime import date
+from decimal import Decimal
+from models.models import Employee, MonthlySalarySummary, SalarySlip, User
+from services.salary_summary import refresh_monthly_summary
+
+MONTH = date(2026, 3, 1)
+
+
+def _team(session):
+    session.add(User(id=1, username="manager1", email="manager1@example.com", password_hash="x"))
+    session.add(User(id=2, username="manager2", email="manager2@example.com", password_hash="x"))
+    session.add(Employee(
+        id=1, employee_id="E0001", first_name="First", last_name="Last1", cnp="1900101000001",
+        email="employee1@example.com", department="Dept1", position="Engineer", manager_id=1,
+    ))
+    session.commit()
+
+
+def _slip(session, slip_id, month, total):
+    session.add(SalarySlip(
+        id=slip_id, employee_id=1, month=month, base_salary=4200, working_days=20, vacation_days=1,
+        bonuses=total - 4200, total_salary=total,
+    ))
+    session.flush()
+
+
+def test_refresh_keeps_the_latest_slip_of_the_month(pg_db):
+    _team(pg_db)
+    _slip(pg_db, 1, MONTH.replace(day=15), 4500)
+    _slip(pg_db, 2, MONTH, 4300)
+    refresh_monthly_summary(pg_db)
+    pg_db.commit()
+
+    row = pg_db.get(MonthlySalarySummary, (1, MONTH))
+    assert (row.salary_slip_id, row.total_salary, row.manager_id) == (1, Decimal("4500.00"), 1)
+
+
+def test_refresh_picks_up_new_slips(pg_db):
+    _team(pg_db)
+    _slip(pg_db, 1, MONTH, 4300)
+    refresh_monthly_summary(pg_db, employee_ids=[1], months=[MONTH])
+    pg_db.commit()
+    assert pg_db.get(MonthlySalarySummary, (1, MONTH)).total_salary == Decimal("4300.00")
+
+    _slip(pg_db, 2, MONTH.replace(day=20), 4800)
+    refresh_monthly_summary(pg_db, employee_ids=[1], months=[MONTH])
+    pg_db.commit()
+    pg_db.expire_all()
+    row = pg_db.get(MonthlySalarySummary, (1, MONTH))
+    assert (row.salary_slip_id, row.total_salary) == (2, Decimal("4800.00"))
+
+
+def test_reassignment_moves_the_summary_rows(db, seed_team):
+    seed_team(2)
+    db.add(User(id=2, username="manager2", email="manager2@example.com", password_hash="x"))
+    db.commit()
+
+    employee = db.get(Employee, 1)
+    employee.manager_id = 2
+    employee.department = "Finance"
+    db.commit()
+
+    rows = db.query(MonthlySalarySummary.employee_id, MonthlySalarySummary.manager_id, MonthlySalarySummary.department)
+    assert sorted(rows) == [(1, 2, "Finance"), (2, 1, "Dept2")]
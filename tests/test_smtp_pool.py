@@ -0,0 +1,48 @@
+from email.message import EmailMessage
+from core.metrics import EMAILS_SENT
+from services.smtp_pool import SMTPConnectionPool
+
+
+def _message(i):
+    msg = EmailMessage()
+    msg["Subject"] = f"Message {i}"
+    msg["From"] = "payroll@example.com"
+    msg["To"] = f"employee{i}@example.com"
+    msg.set_content("Salary slip")
+    return msg
+
+
+def test_reconnects_after_server_restart(smtp_server):
+    pool = SMTPConnectionPool("127.0.0.1", smtp_server.port, starttls=False, max_connections=3)
+    try:
+        assert pool.send_many([_message(i) for i in range(20)]) == [None] * 20
+        assert pool._idle.qsize() > 1
+
+        # Every pooled session is dead after the restart; the first send must still succeed.
+        smtp_server.restart()
+        for i in range(20, 25):
+            pool.send(_message(i))
+    finally:
+        pool.close()
+    assert sorted(smtp_server.recipients) == sorted(f"employee{i}@example.com" for i in range(25))
+
+
+def test_send_many_builds_messages_lazily(smtp_server):
+    pool = SMTPConnectionPool("127.0.0.1", smtp_server.port, starttls=False, max_connections=2)
+    built = []
+
+    def _build(i):
+        built.append(i)
+        if i == 3:
+            raise OSError("archive unavailable")
+        return _message(i)
+
+    failed_before = EMAILS_SENT._values.get(("failed",), 0)
+    try:
+        results = pool.send_many((lambda i=i: _build(i) for i in range(6)), total=6)
+    finally:
+        pool.close()
+    assert EMAILS_SENT._values[("failed",)] == failed_before + 1
+    assert [type(error) for error in results] == [type(None)] * 3 + [OSError] + [type(None)] * 2
+    assert sorted(built) == list(range(6))
+    assert sorted(smtp_server.recipients) == sorted(f"employee{i}@example.com" for i in (0, 1, 2, 4, 5))
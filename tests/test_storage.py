@@ -0,0 +1,52 @@
+import os
+from datetime import date
+import pytest
+from moto import mock_aws
+from core.storage import LocalStorage, S3Storage, archive_key, iter_artifact
+
+
+def test_archive_key_is_sharded_by_month_and_manager():
+    assert archive_key(7, "salary_report.xlsx", date(2026, 3, 9)) == "2026/03/7/salary_report.xlsx"
+
+
+def test_local_storage_round_trip(tmp_path):
+    backend = LocalStorage(str(tmp_path))
+    key = archive_key(7, "slip.pdf", date(2026, 3, 9))
+    backend.put_bytes(key, b"x" * 3_000_000)
+    assert backend.exists(key)
+    assert b"".join(iter_artifact(backend, key)) == backend.get_bytes(key) == b"x" * 3_000_000
+    assert os.listdir(tmp_path / "2026" / "03" / "7") == ["slip.pdf"]
+
+
+
+@pytest.fixture
+def s3_backend(monkeypatch):
+    # moto stands in for S3/MinIO in-process; the backend only talks the S3 API.
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws():
+        backend = S3Storage("salary-archive", prefix="archive/", region="us-east-1")
+        backend.client.create_bucket(Bucket="salary-archive")
+        yield backend
+
+
+def test_s3_storage_round_trip(s3_backend):
+    key = archive_key(7, "slip.pdf", date(2026, 3, 9))
+    assert not s3_backend.exists(key)
+    s3_backend.put_bytes(key, b"x" * 3_000_000)
+    assert s3_backend.exists(key)
+    assert b"".join(iter_artifact(s3_backend, key)) == s3_backend.get_bytes(key) == b"x" * 3_000_000
+
+    report_key = archive_key(7, "salary_report.xlsx", date(2026, 3, 9))
+    with s3_backend.staged_path(report_key) as tmp_path:
+        with open(tmp_path, "wb") as f:
+            f.write(b"PK report")
+    assert not os.path.exists(tmp_path)
+    with s3_backend.open(report_key) as f:
+        assert f.read() == b"PK report"
+
+    listed = s3_backend.client.list_objects_v2(Bucket="salary-archive")["Contents"]
+    assert sorted(obj["Key"] for obj in listed) == [
+        "archive/2026/03/7/salary_report.xlsx",
+        "archive/2026/03/7/slip.pdf",
+    ]
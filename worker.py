@@ -0,0 +1,8 @@
+from core.jobs import run_worker
+from core.metrics import start_metrics_server
+import services.report_jobs  # noqa: F401  registers the job handlers
+
+
+if __name__ == "__main__":
+    start_metrics_server()
+    run_worker()